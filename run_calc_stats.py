@@ -7,7 +7,9 @@ from scr.devtools.parser import CustomArgumentParser, CustomFormatter, inplace_p
 
 from scr.io.tracks import save_tracks_and_stats
 
-from scr.pipelines.processing.stats_computation import compute_stats_from_contours
+from scr.pipelines.processing.stats_computation import compute_stats_from_contours, stream_stats_from_contours
+
+from scr.stats.computation.registry import STAT_REGISTRY
 
 
 if __name__ == "__main__":
@@ -68,6 +70,74 @@ if __name__ == "__main__":
         help="Minimum step between two contour vertices before sampling a map."
     )
 
+    # Statistics selection
+    statistics = parser.add_argument_group("statistics")
+    statistics.add_argument(
+        "--stats",
+        dest="stat_names",
+        type=str,
+        choices=list(STAT_REGISTRY),
+        default=None,
+        nargs="+",
+        help="Statistics to compute together with the statistics they depend on; all if not given.\n"
+             "Only the intermediates they need (masks, mu, lon/lat, ...) are computed."
+    )
+
+    # Output settings
+    output = parser.add_argument_group("output")
+    output.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream flat per-(spot, frame) rows to one Parquet file per stat type (one row group per\n"
+             "chunk of --chunk_size frames) instead of collecting nested statistics in the .npz file."
+    )
+
+    # Performance settings
+    performance = parser.add_argument_group("performance")
+    performance.add_argument(
+        "--flux_engine",
+        type=str,
+        choices=["dense", "sparse"],
+        default="dense",
+        nargs=1,
+        help="Integrate area fluxes mask by mask (dense) or all masks of a frame at once (sparse)."
+    )
+    performance.add_argument(
+        "--lonlat_method",
+        type=str,
+        choices=["astropy", "numpy"],
+        default="astropy",
+        nargs=1,
+        help="Heliographic coordinates via sunpy frames (astropy) or the closed-form transform (numpy)."
+    )
+    performance.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse per-(spot, frame) results from the sidecar store next to the contour file\n"
+             "and compute only missing or changed entries (e.g. a new quantity only costs its fluxes)."
+    )
+    performance.add_argument(
+        "--n_workers",
+        type=int,
+        default=1,
+        nargs=1,
+        help="Number of worker processes (0 for all CPUs). Ignored with --incremental."
+    )
+    performance.add_argument(
+        "--chunk_size",
+        type=int,
+        default=8,
+        nargs=1,
+        help="Number of consecutive frames per parallel work unit (or per row group with --stream)."
+    )
+    performance.add_argument(
+        "--memory_per_worker_gb",
+        type=float,
+        default=None,
+        nargs=1,
+        help="Expected peak memory of a worker in GB; caps the number of workers to the available memory."
+    )
+
     # Create a proper "optional arguments" group for help
     optional = parser.add_argument_group("optional arguments")
     optional.add_argument(
@@ -87,23 +157,53 @@ if __name__ == "__main__":
 
     print_args(args)
 
-    tracks, stats, metadata = compute_stats_from_contours(
-        contour_file=args.contour_file,
-        quantities=args.quantities,
-        stat_types=args.stat_types,
-        header_index=args.header_index,
-        min_step=args.min_step,
+    output_file = args.contour_file.replace(
+        ".npz",
+        (
+            f"{SEP_OUT}{f'{SEP_IN}'.join(args.quantities)}"
+            f"{SEP_OUT}{f'{SEP_IN}'.join(args.stat_types)}"
+            f".npz"
+        )
     )
 
+    if args.stream:
+        tracks, metadata = stream_stats_from_contours(
+            contour_file=args.contour_file,
+            output_files={
+                stat_type: args.contour_file.replace(
+                    ".npz",
+                    f"{SEP_OUT}{f'{SEP_IN}'.join(args.quantities)}{SEP_OUT}{stat_type}.parquet"
+                )
+                for stat_type in args.stat_types
+            },
+            observation_id=output_file,
+            quantities=args.quantities,
+            header_index=args.header_index,
+            min_step=args.min_step,
+            flux_engine=args.flux_engine,
+            lonlat_method=args.lonlat_method,
+            stat_names=args.stat_names,
+            chunk_size=args.chunk_size,
+        )
+        stats = {stat_type: {} for stat_type in args.stat_types}
+    else:
+        tracks, stats, metadata = compute_stats_from_contours(
+            contour_file=args.contour_file,
+            quantities=args.quantities,
+            stat_types=args.stat_types,
+            header_index=args.header_index,
+            min_step=args.min_step,
+            flux_engine=args.flux_engine,
+            lonlat_method=args.lonlat_method,
+            stat_names=args.stat_names,
+            incremental=args.incremental,
+            n_workers=args.n_workers,
+            chunk_size=args.chunk_size,
+            memory_per_worker_gb=args.memory_per_worker_gb,
+        )
+
     save_tracks_and_stats(
-        filename=args.contour_file.replace(
-            ".npz",
-            (
-                f"{SEP_OUT}{f'{SEP_IN}'.join(args.quantities)}"
-                f"{SEP_OUT}{f'{SEP_IN}'.join(args.stat_types)}"
-                f".npz"
-            )
-        ),
+        filename=output_file,
         tracks=tracks,
         stats=stats,
         metadata=metadata
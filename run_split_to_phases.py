@@ -46,7 +46,49 @@ if __name__ == "__main__":
     slope_opts.add_argument(
         "--collect_new_slopes",
         action="store_true",
-        help="Flag to trigger new slope computation."
+        help="Flag to trigger new slope computation (spots with unchanged flux series reuse their cached fits)."
+    )
+    slope_opts.add_argument(
+        "--slope_engine",
+        type=str,
+        choices=["pwlf", "exact"],
+        default="pwlf",
+        nargs=1,
+        help="Piecewise-linear fits by pwlf's stochastic optimiser or by the exact optimal-partition programme."
+    )
+    slope_opts.add_argument(
+        "--slope_warm_start",
+        action="store_true",
+        help="With --slope_engine pwlf, seed each segment count from the previous fit instead of\n"
+             "a global optimisation per segment count."
+    )
+
+    # Output settings
+    output = parser.add_argument_group("output")
+    output.add_argument(
+        "--layout",
+        type=str,
+        choices=["monolithic", "partitioned"],
+        default="monolithic",
+        nargs=1,
+        help="One .npz/.parquet pair for all observations, or a dataset directory with one partition\n"
+             "per observation and a manifest (only the partitions of the split observations are rewritten)."
+    )
+    output.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only split contour files that are new or changed (by content hash) since they were added\n"
+             "to the partitioned dataset, and add them to it (requires --layout partitioned)."
+    )
+
+    # Performance settings
+    performance = parser.add_argument_group("performance")
+    performance.add_argument(
+        "--n_workers",
+        type=int,
+        default=1,
+        nargs=1,
+        help="Number of worker processes loading the contour files and fitting slopes (0 for all CPUs)."
     )
 
     # Create a proper "optional arguments" group for help
@@ -72,7 +114,12 @@ if __name__ == "__main__":
     _, _ = compute_phase_split(
         contour_files=sorted(glob(path.join(args.contour_dirname, "*.npz"))),
         mode=args.mode,
-        collect_new_slopes=args.collect_new_slopes
+        collect_new_slopes=args.collect_new_slopes,
+        n_workers=args.n_workers,
+        slope_engine=args.slope_engine,
+        slope_warm_start=args.slope_warm_start,
+        layout=args.layout,
+        incremental=args.incremental
     )
 
     farewell()
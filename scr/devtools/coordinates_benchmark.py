@@ -0,0 +1,103 @@
+import numpy as np
+from astropy.io import fits
+from time import perf_counter
+
+from scr.utils.types_alias import Header
+
+from scr.geometry.solar.coordinates import SolarCoordinates
+
+
+# (name, XCEN, YCEN) in arcsec; near-limb pointings put the limb across the frame
+POINTINGS = [
+    ("disk centre", 0., 0.),
+    ("mid disk", 300., -200.),
+    ("near limb W", 850., 300.),
+    ("near limb SE", -600., -760.),
+]
+
+
+def synthetic_header(
+        shape: tuple[int, int],
+        xcen: float = 0.,
+        ycen: float = 0.,
+        cdelt: float = 0.504,
+        date_obs: str = "2014-01-01T00:00:00.00"
+) -> Header:
+    """HMI-like header of a frame of the given shape centred at (xcen, ycen) arcsec."""
+    ny, nx = shape
+
+    header = fits.Header()
+    header["NAXIS"] = 2
+    header["NAXIS1"] = nx
+    header["NAXIS2"] = ny
+    header["CDELT1"] = cdelt
+    header["CDELT2"] = cdelt
+    header["CRPIX1"] = (nx + 1.) / 2. - xcen / cdelt
+    header["CRPIX2"] = (ny + 1.) / 2. - ycen / cdelt
+    header["CROTA2"] = 0.
+    header["RSUN_OBS"] = 960.
+    header["DSUN_OBS"] = 1.496e11
+    header["CRLN_OBS"] = 10.
+    header["CRLT_OBS"] = 3.
+    header["DATE-OBS"] = date_obs
+    header["T_OBS"] = f"{date_obs}_TAI"
+
+    return header
+
+
+def _timed(func, *args, **kwargs):
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def benchmark_coordinate_approximation(
+        shape: tuple[int, int] = (2048, 2048),
+        step: int = 16,
+        max_error: float = 1e-4,
+        include_astropy: bool = False
+) -> list[dict]:
+    """
+    Accuracy and speed of the coarse-grid approximation of lon/lat and mu maps
+    against their exact (closed-form, optionally also astropy) evaluation.
+
+    Returns one row per pointing and prints them as a table.
+    """
+    rows = []
+
+    for name, xcen, ycen in POINTINGS:
+        header = synthetic_header(shape, xcen=xcen, ycen=ycen)
+        coordinates = SolarCoordinates(header, method="numpy")
+
+        (lon, lat), t_exact = _timed(coordinates.lonlat_window)
+        (lon_approx, lat_approx), t_approx = _timed(coordinates.lonlat_window, step=step, max_error=max_error)
+        mu, t_mu_exact = _timed(coordinates.mu_window)
+        mu_approx, t_mu_approx = _timed(coordinates.mu_window, step=step, max_error=max_error)
+
+        row = {
+            "pointing": name,
+            "on_disk": float(np.mean(np.isfinite(mu))),
+            "lonlat_max_error": float(np.nanmax(np.abs(np.concatenate([lon - lon_approx, lat - lat_approx])))),
+            "mu_max_error": float(np.nanmax(np.abs(mu - mu_approx))),
+            "same_nans": bool(np.array_equal(np.isnan(mu), np.isnan(mu_approx))),
+            "lonlat_exact_s": t_exact,
+            "lonlat_approx_s": t_approx,
+            "mu_exact_s": t_mu_exact,
+            "mu_approx_s": t_mu_approx,
+        }
+
+        if include_astropy:
+            _, row["lonlat_astropy_s"] = _timed(SolarCoordinates(header, method="astropy").lonlat_window)
+
+        rows.append(row)
+
+    print(f"shape = {shape}, step = {step}, max_error = {max_error}")
+    for row in rows:
+        print("  ".join(f"{key}: {value:.3g}" if isinstance(value, float) else f"{key}: {value}"
+                        for key, value in row.items()))
+
+    return rows
+
+
+if __name__ == "__main__":
+    benchmark_coordinate_approximation(include_astropy=True)
@@ -1,6 +1,7 @@
 import numpy as np
 
-from scr.utils.types_alias import Contour
+from scr.utils.types_alias import Contour, Contours
+from scr.utils.filesystem import is_empty
 
 
 def densify_contour(
@@ -25,26 +26,102 @@ def densify_contour(
     -------
     dense : (M, 2) array
         Densified polyline.
+
+    Notes
+    -----
+    All segments are densified at once (see `densify_contours`); the output is
+    identical to inserting `np.linspace(p0, p1, n_intervals + 1)[1:]` per segment.
+    """
+    return densify_contours([contour], min_step=min_step)[0]
+
+
+def densify_contours(
+        contours: Contours,
+        min_step: float = 0.5
+) -> Contours:
     """
-    new_points = [contour[0]]
+    Densify a list of polylines in one vectorised pass (per floating dtype).
+
+    Parameters
+    ----------
+    contours : list of (N_i, 2) arrays
+        Polyline vertices. Empty contours are returned unchanged.
+    min_step : float
+        Maximum allowed spacing between points.
+
+    Returns
+    -------
+    dense : list of (M_i, 2) arrays
+        Densified polylines (views into one concatenated array), as `densify_contour` of
+        each: contours needing no new points keep their dtype, the others are floating
+        like np.linspace (float64 for integer contours).
+    """
+    dense = list(contours)
+
+    # contours computed together share the dtype of np.linspace of their vertices
+    by_dtype: dict[np.dtype, list[int]] = {}
+    for i, contour in enumerate(contours):
+        if not is_empty(contour):
+            by_dtype.setdefault(np.result_type(np.asarray(contour), 1.), []).append(i)
+
+    for dtype, indices in by_dtype.items():
+        parts = [np.asarray(contours[i]) for i in indices]
+        for i, part, densified in zip(indices, parts, _densify_concatenated(parts, dtype, min_step=min_step)):
+            dense[i] = np.array(part) if densified is None else densified
+
+    return dense
+
+
+def _densify_concatenated(
+        parts: list[np.ndarray],
+        dtype: np.dtype,
+        min_step: float
+) -> list[np.ndarray | None]:
+    # densified contours in dtype, None for contours where no point is inserted
+    points = np.concatenate(parts, axis=0).astype(dtype, copy=False)
+
+    # first vertex of every contour in the concatenated array
+    starts = np.cumsum([0] + [len(c) for c in parts[:-1]])
+
+    p0, p1 = points[:-1], points[1:]
+    seg = p1 - p0
+    dist = np.hypot(seg[:, 0], seg[:, 1])
+
+    # number of intervals per segment; a single interval emits p1 only
+    n_intervals = np.ones(len(seg), dtype=np.int64)
+    long_seg = ~(dist <= min_step)
+    n_intervals[long_seg] = np.ceil(dist[long_seg] / min_step).astype(np.int64)
+
+    # "segments" joining two contours emit the first vertex of the next contour only
+    n_intervals[starts[1:] - 1] = 1
 
-    for p0, p1 in zip(contour[:-1], contour[1:]):
-        seg = p1 - p0
-        dist = np.hypot(seg[0], seg[1])
+    # all inserted points: segment index and position j = 1..n within the segment
+    seg_index = np.repeat(np.arange(len(seg)), n_intervals)
+    first_out = np.cumsum(n_intervals) - n_intervals
+    j = (np.arange(len(seg_index)) - first_out[seg_index] + 1).astype(dtype)
 
-        if dist <= min_step:
-            # no densification needed
-            new_points.append(p1)
-            continue
+    div = n_intervals.astype(dtype)[:, np.newaxis]
+    step = seg / div
 
-        # number of intervals; +1 ensures spacing <= min_step
-        n_intervals = int(np.ceil(dist / min_step))
+    # same arithmetic as np.linspace (incl. its special case for a zero step)
+    zero_step = np.any(step == 0, axis=1)[seg_index]
+    jj = j[:, np.newaxis]
+    new_points = np.where(
+        zero_step[:, np.newaxis],
+        (jj / div[seg_index]) * seg[seg_index],
+        jj * step[seg_index],
+    )
+    new_points += p0[seg_index]
 
-        # generate points including both endpoints
-        dense_seg = np.linspace(p0, p1, n_intervals + 1)
+    # endpoints are copied exactly
+    is_end = j == n_intervals[seg_index]
+    new_points[is_end] = p1[seg_index[is_end]]
 
-        # skip the first point to avoid duplicating p0
-        for pt in dense_seg[1:]:
-            new_points.append(pt)
+    out = np.concatenate([points[:1], new_points], axis=0)
 
-    return np.vstack(new_points)
+    # split back per contour; a contour is densified if it has more output than input points
+    out_starts = np.concatenate([[0], 1 + first_out[starts[1:] - 1], [len(out)]])
+    return [
+        out[out_starts[k]:out_starts[k + 1]] if out_starts[k + 1] - out_starts[k] > len(part) else None
+        for k, part in enumerate(parts)
+    ]
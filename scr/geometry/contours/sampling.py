@@ -1,8 +1,10 @@
 import numpy as np
 from scipy.ndimage import map_coordinates
+from typing import Sequence
 
-from scr.utils.types_alias import Contour
+from scr.utils.types_alias import Contour, Contours
 
+from scr.geometry.contours.densify import densify_contours
 from scr.geometry.contours.length import compute_contour_arc_lengths
 
 
@@ -31,6 +33,78 @@ def sample_map_at_contour(
         return data_map[r, c]
 
 
+def sample_maps_at_contours(
+        contours: Contours,
+        data_maps: Sequence[np.ndarray] | np.ndarray,
+        interp: bool = True,
+        min_step: float | None = None
+) -> list[np.ndarray]:
+    """
+    Sample several 2D maps at the vertices of all contours in one vectorised call.
+
+    contours: list of (N_i,2) arrays of (row, col) coordinates. Empty contours give empty samples.
+    data_maps: (K,H,W) array or a sequence of K 2D maps of the same shape.
+    interp: if True use bilinear interpolation, identical to `sample_map_at_contour`
+        (map_coordinates with order=1, mode="nearest"). If False use nearest (int indices).
+    min_step: if given, all contours are densified once (see `densify_contours`) before sampling.
+    Returns: list of (K, N_i) arrays, views into one (K, sum(N_i)) array; row k is rounded to the dtype of map k.
+
+    The contours are concatenated with offsets, the interpolation indices and weights are computed
+    once and all K maps are gathered with them, instead of one map_coordinates call per map and contour.
+    """
+    if isinstance(data_maps, np.ndarray) and data_maps.ndim == 2:
+        data_maps = data_maps[np.newaxis]
+
+    dtypes = [np.asarray(data_map).dtype for data_map in data_maps]
+    n_maps = len(dtypes)
+
+    if min_step is not None:
+        contours = densify_contours(contours, min_step=min_step)
+
+    lengths = [len(c) if np.size(c) > 0 else 0 for c in contours]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int)
+
+    if offsets[-1] == 0:
+        return [np.zeros((n_maps, 0)) for _ in contours]
+
+    points = np.concatenate([np.reshape(c, (-1, 2)) for c, n in zip(contours, lengths) if n > 0], axis=0)
+    points = np.asarray(points, dtype=np.float64)
+
+    if isinstance(data_maps, np.ndarray):
+        H, W = data_maps.shape[1:]
+    else:
+        H, W = np.shape(data_maps[0])
+
+    def _gather(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        if isinstance(data_maps, np.ndarray):
+            return np.asarray(data_maps[:, rows, cols], dtype=np.float64)
+        return np.stack([np.asarray(data_map)[rows, cols] for data_map in data_maps]).astype(np.float64)
+
+    if interp:
+        # same boundary handling as map_coordinates(mode="nearest"): neighbour indices are clamped
+        r, c = points[:, 0], points[:, 1]
+        r_floor, c_floor = np.floor(r), np.floor(c)
+        fr, fc = r - r_floor, c - c_floor
+        r0, c0 = np.clip(r_floor, 0, H - 1).astype(int), np.clip(c_floor, 0, W - 1).astype(int)
+        r1, c1 = np.clip(r_floor + 1, 0, H - 1).astype(int), np.clip(c_floor + 1, 0, W - 1).astype(int)
+
+        # same accumulation order as map_coordinates(order=1) for bit-identical results
+        samples = (_gather(r0, c0) * (1. - fr) * (1. - fc) + _gather(r0, c1) * (1. - fr) * fc
+                   + _gather(r1, c0) * fr * (1. - fc) + _gather(r1, c1) * fr * fc)
+    else:
+        samples = _gather(np.round(points[:, 0]).astype(int), np.round(points[:, 1]).astype(int))
+
+    # keep the per-map output dtype of map_coordinates / direct indexing
+    if len(set(dtypes)) == 1:
+        samples = samples.astype(dtypes[0], copy=False)
+    else:
+        samples = samples.astype(np.result_type(*dtypes), copy=False)
+        for k, dtype in enumerate(dtypes):
+            samples[k] = samples[k].astype(dtype)
+
+    return [samples[:, start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
 def calc_arc_lengths(
         contour: Contour,
         lon2d: np.ndarray,
@@ -40,7 +114,15 @@ def calc_arc_lengths(
     lon = sample_map_at_contour(contour=contour, data_map=lon2d, interp=True)
     lat = sample_map_at_contour(contour=contour, data_map=lat2d, interp=True)
 
-    ds = compute_contour_arc_lengths(lon_deg=lon, lat_deg=lat, rsun=rsun)
+    return calc_arc_lengths_from_lonlat(contour_lon=lon, contour_lat=lat, rsun=rsun)
+
+
+def calc_arc_lengths_from_lonlat(
+        contour_lon: np.ndarray,
+        contour_lat: np.ndarray,
+        rsun: float
+) -> np.ndarray:
+    ds = compute_contour_arc_lengths(lon_deg=contour_lon, lat_deg=contour_lat, rsun=rsun)
     ds = 0.5 * (ds + np.roll(ds, 1))  # centre of the arc
 
     return ds
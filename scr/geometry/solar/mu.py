@@ -6,6 +6,7 @@ from sunpy.coordinates import Helioprojective, HeliographicStonyhurst
 
 from scr.utils.types_alias import Header
 
+from scr.geometry.solar.coordinates import SolarCoordinates
 from scr.geometry.solar.time import parse_time_to_astropy
 
 
@@ -40,11 +41,19 @@ def compute_mu_radial(
 
 
 def compute_mu_observer(
-        header: Header
+        header: Header,
+        step: int | None = None,
+        max_error: float = 1e-4
 ) -> np.ndarray:
     """
     Compute mu using full observer geometry and WCS.
+
+    If step is given, mu is interpolated from every step-th pixel (closed-form transform) and refined
+    near the limb so that the error stays below max_error, see `approximate_on_grid`.
     """
+    if step is not None:
+        return SolarCoordinates(header, method="numpy").mu_window(step=step, max_error=max_error)
+
     wcs = WCS(header)
 
     dsun_obs = header["DSUN_OBS"] * u.m
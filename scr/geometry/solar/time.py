@@ -1,5 +1,6 @@
 import re
 from astropy.time import Time
+from functools import lru_cache
 from typing import Literal
 
 from scr.utils.time import parse_datetime
@@ -29,3 +30,14 @@ def parse_time_to_astropy(
         raise ValueError(f"Unparseable time string: {time_str}")
 
     return Time(dt, scale=scale)
+
+
+@lru_cache(maxsize=4096)
+def cached_parse_time_to_astropy(
+        time_str: str,
+        default_scale: Literal["utc", "tai", "tt"] = "utc",
+) -> Time:
+    """
+    Memoised `parse_time_to_astropy`. The returned Time object is shared between calls; do not modify it.
+    """
+    return parse_time_to_astropy(time_str, default_scale=default_scale)
@@ -3,7 +3,7 @@ import astropy.units as u
 
 from scr.utils.types_alias import Header
 
-from scr.geometry.solar.time import parse_time_to_astropy
+from scr.geometry.solar.time import cached_parse_time_to_astropy
 
 
 def fill_header_for_wcs(
@@ -116,7 +116,7 @@ def fill_header_for_wcs(
     header.comments["DATE-OBS"] = "[ISO] Observation date {DATE__OBS}"
 
     if header["DATE-OBS"] is not None:
-        header["MJD-OBS"] = parse_time_to_astropy(header["DATE-OBS"]).mjd
+        header["MJD-OBS"] = cached_parse_time_to_astropy(header["DATE-OBS"]).mjd
     else:
         header["MJD-OBS"] = None
     header.comments["MJD-OBS"] = "[d] MJD of fiducial time"
@@ -125,8 +125,8 @@ def fill_header_for_wcs(
     t_obs = None  # Default if TSTART and TEND aren't present or parsing fails
     if "TSTART" in header and "TEND" in header:
         # Convert to datetime objects
-        tstart = parse_time_to_astropy(header["TSTART"])
-        tend = parse_time_to_astropy(header["TEND"])
+        tstart = cached_parse_time_to_astropy(header["TSTART"])
+        tend = cached_parse_time_to_astropy(header["TEND"])
 
         if tstart and tend:
             # Compute T_OBS as the midpoint
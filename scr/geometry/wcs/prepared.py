@@ -0,0 +1,148 @@
+import re
+import hashlib
+import astropy.units as u
+from astropy.coordinates import SkyCoord
+from astropy.io import fits
+from astropy.time import Time
+from astropy.wcs import WCS
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+from sunpy.coordinates import HeliographicStonyhurst
+
+from scr.utils.types_alias import Header
+
+from scr.geometry.solar.time import cached_parse_time_to_astropy
+from scr.geometry.wcs.header import fill_header_for_wcs
+
+
+# keywords that define the pixel -> helioprojective mapping
+_POINTING_KEY_RE = re.compile(
+    r"^(WCSAXES|NAXIS\d*|CTYPE\d|CUNIT\d|CRPIX\d|CRVAL\d|CDELT\d|CROTA\d|PC\d_\d|CD\d_\d|PV\d_\d+|LONPOLE|LATPOLE)$"
+)
+
+PREPARED_CACHE_SIZE = 1024
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+@dataclass(frozen=True)
+class PreparedHeader:
+    """
+    Header filled for WCS together with the objects derived from it.
+    Instances are shared between calls (and between frames with the same pointing); do not modify them.
+    """
+    header: Header
+    wcs: WCS
+    obstime: Time
+    observer: SkyCoord
+
+
+_prepared: OrderedDict[str, PreparedHeader] = OrderedDict()
+_prepared_hits = 0
+_prepared_misses = 0
+
+
+def header_content_hash(
+        header: Header
+) -> str:
+    """Hash of all cards (keywords and values) of the header."""
+    return hashlib.sha1(repr(tuple(header.items())).encode()).hexdigest()
+
+
+def prepare_header(
+        header: Header
+) -> PreparedHeader:
+    """
+    Memoised `fill_header_for_wcs` + `WCS` + observer time and location, keyed by the header content hash.
+    The input header is not modified.
+
+    The WCS depends only on the pointing keywords and is shared by all frames with identical pointing;
+    it is meant for the pixel <-> helioprojective mapping (the observer comes from `observer`).
+    """
+    global _prepared_hits, _prepared_misses
+
+    key = header_content_hash(header)
+    if key in _prepared:
+        _prepared_hits += 1
+        _prepared.move_to_end(key)
+        return _prepared[key]
+
+    _prepared_misses += 1
+
+    filled = fill_header_for_wcs(header.copy())
+    pointing = tuple((k, v) for k, v in filled.items() if _POINTING_KEY_RE.match(k))
+    obstime = cached_parse_time_to_astropy(filled["T_OBS"])
+
+    prepared = PreparedHeader(
+        header=filled,
+        wcs=_pointing_wcs(pointing),
+        obstime=obstime,
+        observer=_observer(filled["T_OBS"], float(filled["DSUN_OBS"]),
+                           float(filled["CRLN_OBS"]), float(filled["CRLT_OBS"])),
+    )
+
+    _prepared[key] = prepared
+    if len(_prepared) > PREPARED_CACHE_SIZE:
+        _prepared.popitem(last=False)
+
+    return prepared
+
+
+@lru_cache(maxsize=256)
+def _pointing_wcs(
+        pointing: tuple[tuple[str, object], ...]
+) -> WCS:
+    return WCS(fits.Header(pointing))
+
+
+@lru_cache(maxsize=PREPARED_CACHE_SIZE)
+def _observer(
+        t_obs: str,
+        dsun_obs: float,
+        crln_obs: float,
+        crlt_obs: float
+) -> SkyCoord:
+    # Define observer's location in Heliographic Stonyhurst frame
+    return SkyCoord(
+        lon=crln_obs * u.deg,
+        lat=crlt_obs * u.deg,
+        radius=dsun_obs * u.m,
+        frame=HeliographicStonyhurst,
+        obstime=cached_parse_time_to_astropy(t_obs)
+    )
+
+
+def header_cache_info() -> dict[str, CacheInfo]:
+    """Hits, misses and sizes of the header preparation caches."""
+    return {
+        "prepared_header": CacheInfo(_prepared_hits, _prepared_misses, PREPARED_CACHE_SIZE, len(_prepared)),
+        "pointing_wcs": CacheInfo(*_pointing_wcs.cache_info()),
+        "observer": CacheInfo(*_observer.cache_info()),
+        "time": CacheInfo(*cached_parse_time_to_astropy.cache_info()),
+    }
+
+
+def format_header_cache_info() -> str:
+    lines = []
+    for name, info in header_cache_info().items():
+        calls = info.hits + info.misses
+        rate = f"{100. * info.hits / calls:.1f}%" if calls else "n/a"
+        lines.append(f"{name}: {info.hits}/{calls} hits ({rate}), size {info.currsize}")
+    return "Header cache: " + "; ".join(lines)
+
+
+def clear_header_cache() -> None:
+    global _prepared_hits, _prepared_misses
+
+    _prepared.clear()
+    _prepared_hits = _prepared_misses = 0
+    _pointing_wcs.cache_clear()
+    _observer.cache_clear()
+    cached_parse_time_to_astropy.cache_clear()
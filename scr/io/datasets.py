@@ -7,15 +7,30 @@ from scr.io.parquet import load_parquet
 from scr.io.pickle import load_pickle
 
 
-def load_contours_and_df_stat(
+def strip_suffix(
         nosuffix_filename: str
-) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
-    """Load contours (.npz) and statistics (.parquet) sharing the same base name."""
+) -> str:
+    """Base name of a phase split, without a ".npz" or ".parquet" suffix."""
     for suffix in [".npz", ".parquet"]:
         if nosuffix_filename.endswith(suffix):
             nosuffix_filename = nosuffix_filename[:-len(suffix)]
+    return nosuffix_filename
+
+
+def load_contours_phases(
+        nosuffix_filename: str
+) -> SunspotsPhasesByObservation:
+    """Load the contours (.npz) of a phase split."""
+    return load_npz(f"{strip_suffix(nosuffix_filename)}.npz")["contours_phases"].item()
+
+
+def load_contours_and_df_stat(
+        nosuffix_filename: str
+) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
+    """Load contours (.npz) and statistics (.parquet) sharing the same base name."""
+    nosuffix_filename = strip_suffix(nosuffix_filename)
 
-    contours = load_npz(f"{nosuffix_filename}.npz")["contours_phases"].item()
+    contours = load_contours_phases(nosuffix_filename)
     df = load_parquet(f"{nosuffix_filename}.parquet")
 
     return contours, df
@@ -1,9 +1,26 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 
-def load_parquet(filename: str) -> pd.DataFrame:
-    """Load a parquet file into a DataFrame."""
-    return pd.read_parquet(filename)
+def load_parquet(
+        filename: str,
+        columns: list[str] | None = None,
+        filters: list[tuple] | list[list[tuple]] | None = None
+) -> pd.DataFrame:
+    """
+    Load a parquet file into a DataFrame.
+
+    columns: only read these columns (all if None).
+    filters: pyarrow row filters, e.g. [("overall_mu_min", ">=", 0.4)]; row groups whose statistics
+        exclude them are skipped and the other rows filtered during the scan.
+    """
+    return pd.read_parquet(filename, columns=columns, filters=filters)
+
+
+def load_parquet_schema(filename: str) -> pa.Schema:
+    """Arrow schema of a parquet file (reads the footer only)."""
+    return pq.read_schema(filename)
 
 
 def save_parquet(filename: str, df: pd.DataFrame) -> None:
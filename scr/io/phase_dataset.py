@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import shutil
+from os import path
+from urllib.parse import quote
+
+from scr.utils.types_alias import ObservationID, SunspotsPhases
+from scr.utils.filesystem import check_dir
+
+from scr.io.npz import load_npz, save_npz
+from scr.io.parquet import load_parquet, load_parquet_schema
+
+
+# Layout of a phase dataset directory:
+#   _manifest.json
+#   observation_id=<URI-encoded observation ID>/stats.parquet   (rows of the observation, without observation_id)
+#   observation_id=<URI-encoded observation ID>/_contours.npz   (SunspotsPhases of the observation)
+# Files starting with "_" are skipped by pyarrow's dataset discovery, so pd.read_parquet(dirname) reads all
+# partitions with observation_id restored from the (hive-style) directory names.
+MANIFEST_FILE = "_manifest.json"
+MANIFEST_VERSION = 1
+
+STATS_FILE = "stats.parquet"
+CONTOURS_FILE = "_contours.npz"
+
+
+def partition_dirname(observation_id: ObservationID) -> str:
+    """Hive-style directory name of the partition of an observation."""
+    return f"observation_id={quote(str(observation_id), safe='')}"
+
+
+def contour_file_source(
+        filename: str,
+        previous: dict | None = None
+) -> dict:
+    """
+    Identity of a contour file for the manifest: {"size", "mtime_ns", "sha1"} of its content.
+    The hash of previous (an earlier source of the file) is reused if its size and mtime still match.
+    """
+    stat = os.stat(filename)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if previous is not None and all(previous.get(key) == value for key, value in source.items()):
+        return source | {"sha1": previous["sha1"]}
+
+    sha = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+
+    return source | {"sha1": sha.hexdigest()}
+
+
+def load_phase_manifest(dirname: str) -> dict:
+    """
+    Load the manifest of a phase dataset: {"version", "mode", "next_spot_global_index",
+    "partitions": {observation_id: entry}, "empty": {observation_id: entry}}, a partition entry holding
+    the partition "path" (relative to dirname), its "n_rows" and the "source" (see `contour_file_source`)
+    of the observation. "empty" records the source of split observations without rows (no partition).
+    An empty manifest if the dataset does not exist yet.
+    """
+    filename = path.join(dirname, MANIFEST_FILE)
+    if not path.isfile(filename):
+        return {"version": MANIFEST_VERSION, "mode": None, "next_spot_global_index": 0, "partitions": {}, "empty": {}}
+
+    with open(filename, "r") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(
+            f"Unknown phase dataset version '{manifest.get('version')}' in '{filename}'. "
+            f"Available options are {MANIFEST_VERSION}."
+        )
+    manifest.setdefault("empty", {})
+
+    return manifest
+
+
+def save_phase_manifest(dirname: str, manifest: dict) -> None:
+    """Save the manifest of a phase dataset (via a temporary file, so readers never see a partial one)."""
+    check_dir(dirname)
+    filename = path.join(dirname, MANIFEST_FILE)
+
+    with open(f"{filename}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{filename}.tmp", filename)
+
+
+def save_phase_partition(
+        dirname: str,
+        observation_id: ObservationID,
+        contours: SunspotsPhases,
+        df: pd.DataFrame
+) -> dict:
+    """
+    Write the partition of one observation (overwriting it if present) and return its manifest entry.
+    The manifest itself is not updated.
+    """
+    partition = partition_dirname(observation_id)
+    check_dir(path.join(dirname, partition))
+
+    df.drop(columns="observation_id").to_parquet(path.join(dirname, partition, STATS_FILE), index=False)
+    save_npz(path.join(dirname, partition, CONTOURS_FILE), contours_phases=contours)
+
+    return {"path": partition, "n_rows": len(df)}
+
+
+def remove_phase_partition(dirname: str, entry: dict) -> None:
+    """Delete the files of a partition. The manifest itself is not updated."""
+    shutil.rmtree(path.join(dirname, entry["path"]), ignore_errors=True)
+
+
+def load_phase_partition_schema(dirname: str, entry: dict) -> pa.Schema:
+    """Arrow schema of the stats of a partition, with observation_id (string) as the first field."""
+    schema = load_parquet_schema(path.join(dirname, entry["path"], STATS_FILE))
+    return schema.insert(0, pa.field("observation_id", pa.string()))
+
+
+def load_phase_partition_stats(
+        dirname: str,
+        entry: dict,
+        observation_id: ObservationID,
+        columns: list[str] | None = None,
+        filters: list[tuple] | None = None
+) -> pd.DataFrame:
+    """
+    Load the stats of a partition with observation_id restored as the first column
+    (columns and pyarrow filters as in `load_parquet`; filters on observation_id are not supported).
+    """
+    read_columns = None if columns is None else [column for column in columns if column != "observation_id"]
+    df = load_parquet(path.join(dirname, entry["path"], STATS_FILE), columns=read_columns, filters=filters)
+
+    if columns is None or "observation_id" in columns:
+        df.insert(0, "observation_id", observation_id)
+
+    return df
+
+
+def load_phase_partition_contours(dirname: str, entry: dict) -> SunspotsPhases:
+    """Load the contours (SunspotsPhases) of a partition."""
+    return load_npz(path.join(dirname, entry["path"], CONTOURS_FILE))["contours_phases"].item()
@@ -24,6 +24,25 @@ def load_tracks_and_stats(
     )
 
 
+def load_tracks_and_stats_of_type(
+        filename: str,
+        stat_type: str
+) -> tuple[dict, dict, dict]:
+    """
+    Load only the tracks and statistics of one object type (e.g. "sunspots") from a .npz file
+    written by `save_tracks_and_stats`; the rest is released right after loading.
+
+    Parameters:
+        filename: Path to the saved .npz archive.
+        stat_type: Key of the tracks and statistics.
+
+    Returns:
+        Tuple of (tracks[stat_type], stats[stat_type], metadata); stats are empty if not stored.
+    """
+    tracks, stats, metadata = load_tracks_and_stats(filename)
+    return tracks[stat_type], stats.get(stat_type, {}), metadata
+
+
 def save_tracks_and_stats(
         filename: str,
         tracks: dict,
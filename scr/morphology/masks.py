@@ -13,6 +13,8 @@ def compute_masks(
         shape: tuple[int, int],
         mask_holes: Mask | None = None,
         dtype: type = np.float32,
+        filling: bool = True,
+        border: bool = True,
 ) -> tuple[Masks, Masks]:
     """
     Build filling-factor masks and 1-pixel border masks for a list of contours.
@@ -28,6 +30,9 @@ def compute_masks(
         (useful to remove umbra from penumbra). Should be same shape.
     dtype : numpy dtype, optional
         dtype for masks (default float32)
+    filling, border : bool, optional
+        Whether to build the filling-factor masks and the border masks, respectively.
+        A skipped kind is returned as an empty list.
 
     Returns
     -------
@@ -40,16 +45,20 @@ def compute_masks(
     if is_empty(contours):
         return [], []
 
-    # build per-contour filling-factor masks
-    masks = [filling_factor_mask(c, shape).astype(dtype) for c in contours]
+    masks, masks_border = [], []
 
-    # optionally subtract holes / inner mask (mask_holes expected same shape)
-    if not is_empty(mask_holes):
-        masks = [subtract_filling_masks(m, mask_holes).astype(dtype) for m in masks]
+    if filling:
+        # build per-contour filling-factor masks
+        masks = [filling_factor_mask(c, shape).astype(dtype) for c in contours]
 
-    # border masks (one-pixel borders)
-    masks_border = [
-        nested_contours_to_mask(c, shape, border_only=True).astype(dtype) for c in contours
-    ]
+        # optionally subtract holes / inner mask (mask_holes expected same shape)
+        if not is_empty(mask_holes):
+            masks = [subtract_filling_masks(m, mask_holes).astype(dtype) for m in masks]
+
+    if border:
+        # border masks (one-pixel borders)
+        masks_border = [
+            nested_contours_to_mask(c, shape, border_only=True).astype(dtype) for c in contours
+        ]
 
     return masks, masks_border
@@ -1,22 +1,105 @@
 import pandas as pd
-from typing import Literal
+import pyarrow as pa
+from typing import Callable, Collection, Literal
 
 from scr.utils.types_alias import SunspotsPhasesByObservation
 from scr.config.filtering import gimme_filtering_kwargs
 
-from scr.io.datasets import load_contours_and_df_stat
+from scr.io.datasets import load_contours_phases, strip_suffix
+from scr.io.parquet import load_parquet, load_parquet_schema
 
-from scr.stats.dataframe.filtering import filter_combined_df
+from scr.stats.dataframe.filtering import plan_filters, plan_columns, pushdown_filters, apply_filter_plan
+
+
+def load_filtered_phase_table(
+        filename: str,
+        filtering_kwargs: dict,
+        columns: list[str] | None = None,
+        drop_unknown: bool = False,
+) -> pd.DataFrame:
+    """
+    Load a phase statistics table (.parquet) and filter it as `filter_combined_df`, reading only
+    what is needed: the requested columns plus those the filters read, and only the rows passing the
+    leading frame-wise filters (e.g. "overall_mu_min", "phase_duration"), which are applied during the
+    scan (see `pushdown_filters`). The remaining filters run on the loaded rows.
+
+    Parameters
+    ----------
+    columns : list[str], optional
+        Columns of the returned table; all if None.
+    drop_unknown : bool
+        Drop rows with phase "unknown" after filtering.
+
+    Notes
+    -----
+    The index of the returned table counts the rows read, not the rows of the file.
+    """
+    return read_filtered_table(
+        read_table=lambda read_columns, filters: load_parquet(filename, columns=read_columns, filters=filters),
+        schema=load_parquet_schema(filename),
+        filtering_kwargs=filtering_kwargs,
+        columns=columns,
+        drop_unknown=drop_unknown,
+    )
+
+
+def read_filtered_table(
+        read_table: Callable[[list[str] | None, list[tuple] | None], pd.DataFrame],
+        schema: pa.Schema,
+        filtering_kwargs: dict,
+        columns: list[str] | None = None,
+        drop_unknown: bool = False,
+        unpushable: Collection[str] = (),
+) -> pd.DataFrame:
+    """
+    `load_filtered_phase_table` of any table source: read_table(columns, filters) reads the table with the
+    given schema as `load_parquet`. Filters on unpushable columns (and on list columns) run after reading.
+    """
+    plan = plan_filters(schema.names, filtering_kwargs)
+
+    scalar_columns = [
+        field.name for field in schema if not pa.types.is_nested(field.type) and field.name not in unpushable
+    ]
+    pushed, remaining = pushdown_filters(plan, pushable_columns=scalar_columns)
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(
+            columns + plan_columns(remaining) + (["phase"] if drop_unknown and "phase" in schema.names else [])
+        ))
+
+    combined_df = read_table(read_columns, pushed or None)
+    combined_df = apply_filter_plan(combined_df, remaining) if remaining else combined_df
+
+    if drop_unknown and "phase" in combined_df:
+        combined_df = combined_df[combined_df["phase"] != "unknown"]
+
+    if columns is not None and list(combined_df.columns) != columns:
+        combined_df = combined_df[columns]
+
+    return combined_df
 
 
 def load_filtered_phase_tracks(
         nosuffix_filename: str,
         mode: Literal["sunspots", "pores", "all_sunspots", "all_pores"],
         drop_unknown: bool = True,
+        columns: list[str] | None = None,
+        filtering_kwargs: dict | None = None,
 ) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
     """
     Load contour phase tracks and apply standard filtering.
 
+    The filters and column selection are applied while reading the table
+    (see `load_filtered_phase_table`).
+
+    Parameters
+    ----------
+    columns : list[str], optional
+        Columns of the returned table; all if None.
+    filtering_kwargs : dict, optional
+        Filters as in `filter_combined_df`; `gimme_filtering_kwargs(mode)` if None.
+
     Returns
     -------
     contours_phases : dict
@@ -24,15 +107,17 @@ def load_filtered_phase_tracks(
     combined_df : pandas.DataFrame
         Filtered metadata table.
     """
-    contours_phases, combined_df = load_contours_and_df_stat(nosuffix_filename)
+    nosuffix_filename = strip_suffix(nosuffix_filename)
+    contours_phases = load_contours_phases(nosuffix_filename)
+
+    if filtering_kwargs is None:
+        filtering_kwargs = gimme_filtering_kwargs(mode=mode)
 
-    filtering_kwargs = gimme_filtering_kwargs(mode=mode)
-    combined_df = filter_combined_df(
-        combined_df,
+    combined_df = load_filtered_phase_table(
+        f"{nosuffix_filename}.parquet",
         filtering_kwargs=filtering_kwargs,
+        columns=columns,
+        drop_unknown=drop_unknown,
     )
 
-    if drop_unknown and "phase" in combined_df:
-        combined_df = combined_df[combined_df["phase"] != "unknown"]
-
     return contours_phases, combined_df
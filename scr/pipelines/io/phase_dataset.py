@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from typing import Literal
+
+from scr.utils.types_alias import ObservationID, SunspotsPhasesByObservation
+from scr.utils.collections import nested_defaultdict
+
+from scr.io.phase_dataset import (
+    load_phase_manifest,
+    save_phase_manifest,
+    save_phase_partition,
+    remove_phase_partition,
+    load_phase_partition_schema,
+    load_phase_partition_stats,
+    load_phase_partition_contours,
+)
+
+from scr.pipelines.io.load_phase_tracks import read_filtered_table
+
+
+def write_phase_dataset(
+        dirname: str,
+        contours_phases: SunspotsPhasesByObservation,
+        combined_df: pd.DataFrame,
+        mode: Literal["sunspots", "pores"] | None = None,
+        entries: dict[ObservationID, dict] | None = None,
+        observation_ids: list[ObservationID] | None = None,
+) -> dict:
+    """
+    Write the phase split as a dataset partitioned by observation_id (see `scr.io.phase_dataset`): one
+    partition per observation of combined_df, replacing existing partitions of the same observations.
+    Partitions of other observations are kept as they are.
+
+    entries: extra manifest fields per observation (e.g. the "source" of the partition), applied to the
+        written observations and to the existing records of other observations.
+    observation_ids: the split observations, those of combined_df if None. Split observations without
+        rows in combined_df lose their partition and are recorded under "empty" instead.
+
+    Returns: the updated manifest.
+    """
+    manifest = load_phase_manifest(dirname)
+    if mode is not None:
+        manifest["mode"] = mode
+
+    written = set()
+    for obs_id, df in combined_df.groupby("observation_id", observed=True, sort=False):
+        entry = save_phase_partition(
+            dirname,
+            observation_id=obs_id,
+            contours=contours_phases.get(obs_id, {}),
+            df=df.reset_index(drop=True),
+        )
+        manifest["partitions"][obs_id] = entry
+        manifest["empty"].pop(obs_id, None)
+        written.add(obs_id)
+
+    removed = []
+    for obs_id in set(observation_ids or ()) - written:
+        if obs_id in manifest["partitions"]:
+            removed.append(manifest["partitions"].pop(obs_id))
+        manifest["empty"][obs_id] = {}
+
+    for obs_id, fields in (entries or {}).items():
+        for records in (manifest["partitions"], manifest["empty"]):
+            if obs_id in records:
+                records[obs_id].update(fields)
+
+    if "spot_global_index" in combined_df and len(combined_df) > 0:
+        manifest["next_spot_global_index"] = max(
+            manifest.get("next_spot_global_index", 0), int(combined_df["spot_global_index"].max()) + 1
+        )
+
+    manifest["partitions"] = dict(sorted(manifest["partitions"].items()))
+    manifest["empty"] = dict(sorted(manifest["empty"].items()))
+    save_phase_manifest(dirname, manifest)
+
+    # files of removed partitions go once the manifest no longer lists them
+    for entry in removed:
+        remove_phase_partition(dirname, entry)
+
+    return manifest
+
+
+def _concat_partitions(
+        dfs: list[pd.DataFrame],
+        observation_ids: list[ObservationID]
+) -> pd.DataFrame:
+    # as the rows of the monolithic phase table: float32 only where float32 in every partition and
+    # categoricals over the categories of all partitions (observation_id over all observations)
+    float32_columns = set.intersection(*({c for c in df.columns if df[c].dtype == np.float32} for df in dfs))
+    categories = {
+        column: sorted(set().union(*(
+            df[column].cat.categories for df in dfs if isinstance(df[column].dtype, pd.CategoricalDtype)
+        )))
+        for column in dfs[0].columns if any(isinstance(df[column].dtype, pd.CategoricalDtype) for df in dfs)
+    }
+    if "observation_id" in dfs[0].columns:
+        categories["observation_id"] = sorted(observation_ids)
+
+    df = pd.concat(dfs, ignore_index=True)
+
+    for column in df.columns:
+        if df[column].dtype == np.float32 and column not in float32_columns:
+            df[column] = df[column].astype(np.float64)
+    for column, column_categories in categories.items():
+        df[column] = pd.Categorical(df[column], categories=column_categories)
+
+    return df
+
+
+def load_phase_dataset(
+        dirname: str,
+        observation_ids: list[ObservationID] | None = None,
+        columns: list[str] | None = None,
+        filtering_kwargs: dict | None = None,
+        drop_unknown: bool = False,
+        load_contours: bool = True,
+) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
+    """
+    Load (some observations of) a phase dataset written by `write_phase_dataset`, opening only the
+    partitions of the requested observations.
+
+    Parameters
+    ----------
+    observation_ids : list, optional
+        Observations to load; all if None.
+    columns, filtering_kwargs, drop_unknown
+        As in `load_filtered_phase_table`, applied partition by partition (group-wise filters never
+        span observations).
+    load_contours : bool
+        Also load the contours; otherwise the returned contours are empty.
+
+    Returns
+    -------
+    contours_phases : dict
+        Nested contour structure per observation.
+    combined_df : pandas.DataFrame
+        Filtered metadata table, as the monolithic table restricted to the observations.
+    """
+    manifest = load_phase_manifest(dirname)
+    partitions = manifest["partitions"]
+
+    if observation_ids is None:
+        observation_ids = list(partitions)
+    else:
+        missing = [obs_id for obs_id in observation_ids if obs_id not in partitions]
+        if missing:
+            raise KeyError(f"Observations {missing} not found in the phase dataset '{dirname}'")
+        observation_ids = sorted(set(observation_ids))
+
+    contours_phases = nested_defaultdict(depth=2)
+    dfs = []
+
+    for obs_id in observation_ids:
+        entry = partitions[obs_id]
+
+        dfs.append(read_filtered_table(
+            read_table=lambda read_columns, filters: load_phase_partition_stats(
+                dirname, entry, obs_id, columns=read_columns, filters=filters
+            ),
+            schema=load_phase_partition_schema(dirname, entry),
+            filtering_kwargs=filtering_kwargs or {},
+            columns=columns,
+            drop_unknown=drop_unknown,
+            unpushable=("observation_id",),
+        ))
+
+        if load_contours:
+            contours = load_phase_partition_contours(dirname, entry)
+            if contours:
+                contours_phases[obs_id] = contours
+
+    if not dfs:
+        return contours_phases, pd.DataFrame(columns=columns)
+
+    return contours_phases, _concat_partitions(dfs, observation_ids=list(partitions))
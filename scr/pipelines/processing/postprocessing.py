@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from os import path
+from tqdm import tqdm
 from typing import Literal
 
 from scr.config.paths import PATH_CONTOURS_PHASES, SLOPES_FILE
@@ -8,47 +10,138 @@ from scr.config.paths import PATH_CONTOURS_PHASES, SLOPES_FILE
 from scr.utils.types_alias import SunspotsPhasesByObservation
 from scr.utils.filesystem import check_dir
 from scr.utils.nested import nested_cast_arrays_dtype
+from scr.utils.collections import nested_defaultdict
 
 from scr.io.npz import save_npz
 from scr.io.parquet import save_parquet, load_parquet
-from scr.io.tracks import load_tracks_and_stats
+from scr.io.tracks import load_tracks_and_stats_of_type
+from scr.io.phase_dataset import load_phase_manifest, contour_file_source
 
-from scr.stats.dataframe.flatten import flatten_spot_features_with_frame
+from scr.stats.dataframe.flatten import flatten_spot_features_columnar, concat_flat_stats
+from scr.stats.dataframe.stream import load_flat_stats
 from scr.stats.dataframe.filtering import filter_combined_df
 from scr.stats.segments.annotation import apply_segments_to_combined_df
 from scr.stats.segments.collection import collect_slopes
 
 from scr.postanalysis.phases import split_by_phase
 
+from scr.pipelines.io.phase_dataset import write_phase_dataset
 
-def compute_phase_split(
-        contour_files: list[str],
-        mode: Literal["sunspots", "pores"] = "sunspots",
-        collect_new_slopes: bool = False
-) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
-    # --------------------------------------------------------------
-    # 1) Load all tracks & stats
-    # --------------------------------------------------------------
 
-    print("Collecting statistics and contours...")
+def _load_flat_observation(
+        contour_file: str,
+        mode: Literal["sunspots", "pores"]
+) -> tuple[pd.DataFrame, dict, list[str]]:
+    # flat statistics (without spot_global_index), tracks and frame filenames of one observation
+    tracks, stats, metadata = load_tracks_and_stats_of_type(contour_file, mode)
+    # contours are stored as float32 in the phase split; cast once here (and transfer less from workers)
+    tracks = nested_cast_arrays_dtype(tracks, dtype=np.float32)
+
+    # statistics streamed to Parquet by run_calc_stats.py --stream are already flat
+    if mode in metadata.get("flat_stats_files", {}):
+        df = load_flat_stats([metadata["flat_stats_files"][mode]], observation_ids=[contour_file])
+    else:
+        df = flatten_spot_features_columnar(all_stats={contour_file: stats})
+
+    return df.drop(columns="spot_global_index"), tracks, metadata["filename_list"]
 
-    all_stats: dict = {}
+
+def load_flat_observations(
+        contour_files: list[str],
+        mode: Literal["sunspots", "pores"] = "sunspots",
+        n_workers: int = 1
+) -> tuple[pd.DataFrame, dict, dict]:
+    """
+    Load and flatten the statistics of the contour files, one file per task on a process pool.
+    Workers return only the flat statistics, tracks and frame filenames of the given mode, so the
+    full contents of a file are never held in the main process.
+
+    Returns: combined_df (as `flatten_spot_features_with_frame` of all files), all_contours, all_filenames
+    """
     all_contours: dict = {}
     all_filenames: dict = {}
+    dfs = []
+
+    if n_workers == 1:
+        results = map(_load_flat_observation, contour_files, [mode] * len(contour_files))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=n_workers if n_workers > 0 else None)
+        results = executor.map(_load_flat_observation, contour_files, [mode] * len(contour_files))
+
+    try:
+        # in the order of contour_files
+        for contour_file, (df, tracks, filenames) in tqdm(zip(contour_files, results), total=len(contour_files)):
+            dfs.append(df)
+            all_contours[contour_file] = tracks
+            all_filenames[contour_file] = filenames
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-    for contour_file in contour_files:
-        tracks, stats, metadata = load_tracks_and_stats(contour_file)
-        all_stats[contour_file] = stats[mode]
-        all_contours[contour_file] = tracks[mode]
-        all_filenames[contour_file] = metadata["filename_list"]
+    return concat_flat_stats(dfs), all_contours, all_filenames
+
+
+def compute_phase_split(
+        contour_files: list[str],
+        mode: Literal["sunspots", "pores"] = "sunspots",
+        collect_new_slopes: bool = False,
+        n_workers: int = 1,
+        slope_engine: Literal["pwlf", "exact"] = "pwlf",
+        slope_warm_start: bool = False,
+        layout: Literal["monolithic", "partitioned"] = "monolithic",
+        incremental: bool = False
+) -> tuple[SunspotsPhasesByObservation, pd.DataFrame]:
+    """
+    Split the contours and statistics of the contour files into phases (forming / stable / decaying)
+    and save them (see layout).
+
+    With incremental=True (partitioned layout only), only contour files that are new or whose content
+    changed since they were last split (see `contour_file_source`) are processed and written to the
+    dataset; the other partitions are kept. Slopes of the processed observations are always fitted
+    (spots with unchanged flux series come from the fit cache) and merged into SLOPES_FILE.
+    Returns the contours and statistics of the processed observations.
+    """
+    if layout not in ("monolithic", "partitioned"):
+        raise ValueError(f"Unknown layout '{layout}'. Available options are 'monolithic' and 'partitioned'.")
+    if incremental and layout != "partitioned":
+        raise ValueError("Incremental phase split requires the 'partitioned' layout.")
+
+    dataset_dirname = path.join(PATH_CONTOURS_PHASES, f"all_{mode}_phases")
+    sources, next_spot_index = {}, 0
+
+    if layout == "partitioned":
+        manifest = load_phase_manifest(dataset_dirname)
+        previous = {
+            obs_id: entry.get("source")
+            for records in (manifest["partitions"], manifest["empty"])
+            for obs_id, entry in records.items()
+        }
+        sources = {f: contour_file_source(f, previous=previous.get(f)) for f in contour_files}
+
+        if incremental:
+            contour_files = [f for f in contour_files if sources[f]["sha1"] != (previous.get(f) or {}).get("sha1")]
+            next_spot_index = manifest.get("next_spot_global_index", 0)
+            print(f"{len(contour_files)} of {len(sources)} contour files are new or changed.")
+
+            if not contour_files:
+                # refresh the recorded file times only
+                write_phase_dataset(dataset_dirname, {}, pd.DataFrame(columns=["observation_id"]), mode=mode,
+                                    entries={f: {"source": source} for f, source in sources.items()})
+                return nested_defaultdict(depth=2), pd.DataFrame()
 
     # --------------------------------------------------------------
+    # 1) Load all tracks & stats
     # 2) Flatten statistics
     # --------------------------------------------------------------
 
-    print("Flatten statistics...")
+    print("Collecting and flattening statistics and contours...")
 
-    combined_df = flatten_spot_features_with_frame(all_stats=all_stats)
+    combined_df, all_contours, all_filenames = load_flat_observations(
+        contour_files=contour_files,
+        mode=mode,
+        n_workers=n_workers
+    )
 
     combined_df["image_path"] = [
         all_filenames[id_][frame]
@@ -56,39 +149,64 @@ def compute_phase_split(
     ]
     combined_df["image_path"] = combined_df["image_path"].astype("category")
 
-    if collect_new_slopes or not path.isfile(SLOPES_FILE):
+    if next_spot_index:
+        # continue the spot numbering of the existing partitions
+        combined_df["spot_global_index"] = (combined_df["spot_global_index"] + next_spot_index).astype("int32")
+
+    if incremental or collect_new_slopes or not path.isfile(SLOPES_FILE):
         # --------------------------------------------------------------
         # 3) Prefilter ONLY for slope fitting
         # --------------------------------------------------------------
 
         print("Slope fitting...")
 
-        df_fit = filter_combined_df(
-            df=combined_df,
-            filtering_kwargs={
-                "overall_mu_min": {"min_value": 0.15, "mode": "frame-wise"}
-            }
-        )
-
-        df_fit = df_fit[
-            [
-                "observation_id",
-                "sunspot_id",
-                "spot_global_index",
-                "frame",
-                "Br_umbra_corrected_flux_total",
-                "Br_penumbra_corrected_flux_total",
-            ]
-        ].copy()
+        # no rows at all if the processed files hold no spots of the mode
+        df_fit = combined_df
+        if not combined_df.empty:
+            df_fit = filter_combined_df(
+                df=combined_df,
+                filtering_kwargs={
+                    "overall_mu_min": {"min_value": 0.15, "mode": "frame-wise"}
+                }
+            )
+
+            df_fit = df_fit[
+                [
+                    "observation_id",
+                    "sunspot_id",
+                    "spot_global_index",
+                    "frame",
+                    "Br_umbra_corrected_flux_total",
+                    "Br_penumbra_corrected_flux_total",
+                ]
+            ].copy()
 
         # --------------------------------------------------------------
         # 4) Fit slopes
         # --------------------------------------------------------------
 
-        segments_df = collect_slopes(
-            df=df_fit,
-            control_plots=True,
-        )
+        previous_slopes = None
+        if incremental and path.isfile(SLOPES_FILE):
+            # the slopes of the observations not processed now are kept
+            previous_slopes = load_parquet(SLOPES_FILE)
+            previous_slopes = previous_slopes[~previous_slopes["observation_id"].isin(contour_files)]
+
+        if incremental and df_fit.empty:
+            # e.g. only observations near the limb: nothing to fit, the processed ones get no segments
+            print("No rows to fit, keeping the previous slopes.")
+            segments_df = previous_slopes.iloc[:0] if previous_slopes is not None else pd.DataFrame()
+        else:
+            segments_df = collect_slopes(
+                df=df_fit,
+                control_plots=True,
+                n_workers=n_workers,
+                fit_kwargs={"engine": slope_engine, "warm_start": slope_warm_start},
+            )
+
+        if previous_slopes is not None:
+            all_slopes = pd.concat([previous_slopes, segments_df], ignore_index=True)
+            all_slopes["observation_id"] = all_slopes["observation_id"].astype("category")
+            save_parquet(filename=SLOPES_FILE, df=all_slopes)
     else:
         print("Using precomputed slopes...")
 
@@ -142,13 +260,12 @@ def compute_phase_split(
 
     print("Splitting by phases...")
 
+    # the contours are float32 since loading and shared with all_contours
     contours_phases = split_by_phase(
         combined_df,
         all_contours,
     )
 
-    contours_phases = nested_cast_arrays_dtype(contours_phases, dtype=np.float32)
-
     # --------------------------------------------------------------
     # 8) Final output
     # --------------------------------------------------------------
@@ -156,7 +273,22 @@ def compute_phase_split(
     print("Saving...")
     check_dir(PATH_CONTOURS_PHASES)
     filename = path.join(PATH_CONTOURS_PHASES, f"all_{mode}_phases")
-    save_npz(filename=f"{filename}.npz", contours_phases=contours_phases)
-    save_parquet(filename=f"{filename}.parquet", df=combined_df)
+    if layout == "monolithic":
+        save_npz(filename=f"{filename}.npz", contours_phases=contours_phases)
+        save_parquet(filename=f"{filename}.parquet", df=combined_df)
+    else:
+        # one directory per observation (see load_phase_dataset)
+        write_phase_dataset(
+            dataset_dirname,
+            contours_phases=contours_phases,
+            combined_df=combined_df,
+            mode=mode,
+            # sources of the files split now and of the unchanged ones only
+            entries={
+                f: {"source": source} for f, source in sources.items()
+                if f in contour_files or source["sha1"] == (previous.get(f) or {}).get("sha1")
+            },
+            observation_ids=contour_files,
+        )
 
     return contours_phases, combined_df
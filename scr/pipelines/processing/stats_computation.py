@@ -1,12 +1,20 @@
+from tqdm import tqdm
 from typing import Literal
 
 from scr.utils.types_alias import StatsByObject
 
 from scr.io.fits.read import load_fits_headers
+from scr.io.fits.read import load_image
 from scr.io.fits.stack import load_fits_stack
 from scr.io.tracks import load_tracks_and_stats
 
+from scr.geometry.wcs.prepared import format_header_cache_info
+
 from scr.stats.computation.evolution import compute_sunspot_statistics_evolution
+from scr.stats.computation.registry import STAT_REGISTRY, plan_stats
+from scr.stats.computation.parallel import compute_sunspot_statistics_parallel
+from scr.stats.computation.incremental import StatsStore, compute_sunspot_statistics_incremental, stats_store_path
+from scr.stats.dataframe.stream import FlatStatsWriter, flat_stats_columns, flatten_spot_frame
 
 
 def compute_stats_from_contours(
@@ -15,8 +23,20 @@ def compute_stats_from_contours(
         stat_types: list[Literal["sunspots", "pores"]],
         header_index: int = 0,
         min_step: float = 0.5,
+        flux_engine: Literal["dense", "sparse"] = "dense",
+        lonlat_method: Literal["astropy", "numpy"] = "astropy",
+        stat_names: list[str] | None = None,
+        incremental: bool = False,
+        n_workers: int = 1,
+        chunk_size: int = 8,
+        memory_per_worker_gb: float | None = None,
 ) -> tuple[dict, StatsByObject, dict]:
     """
+    With incremental=True, per-(spot, frame) results are reused from the sidecar store next to the contour file
+    (see `compute_sunspot_statistics_incremental`) and only missing or changed entries are computed.
+    Otherwise, with n_workers != 1, the frames are processed in chunks of chunk_size frames on a process pool
+    (see `compute_sunspot_statistics_parallel`).
+
     Returns: tracks, stats, metadata
     """
     tracks, _, metadata = load_tracks_and_stats(contour_file)
@@ -26,6 +46,13 @@ def compute_stats_from_contours(
         "stat_types": stat_types,
         "header_index": header_index,
         "min_step": min_step,
+        "flux_engine": flux_engine,
+        "lonlat_method": lonlat_method,
+        "stat_names": stat_names,
+        "incremental": incremental,
+        "n_workers": n_workers,
+        "chunk_size": chunk_size,
+        "memory_per_worker_gb": memory_per_worker_gb,
     }
     headers = load_fits_headers(
         metadata["filename_list"],
@@ -34,22 +61,161 @@ def compute_stats_from_contours(
 
     stats = {stype: {} for stype in stat_types}
 
+    store = StatsStore.load(stats_store_path(contour_file)) if incremental else None
+
     for quantity in quantities:
         print(f"Quantity: {quantity}")
-        images = load_fits_stack(
-            metadata["filename_list"],
-            quantity,
-            allow_inhomogeneous_shape=True
-        )
+        loaded = {}
+
+        def load_images():
+            if "images" not in loaded:
+                loaded["images"] = load_fits_stack(
+                    metadata["filename_list"],
+                    quantity,
+                    allow_inhomogeneous_shape=True
+                )
+            return loaded["images"]
 
         for stat_type in stat_types:
             print(f"Feature: {stat_type}")
-            stats[stat_type][quantity] = compute_sunspot_statistics_evolution(
-                sunspots=tracks[stat_type],
-                images=images,
-                headers=headers,
-                min_step=min_step,
-                take_abs=quantity in ["Bp", "Bt"]
-            )
+            if incremental:
+                stats[stat_type][quantity] = compute_sunspot_statistics_incremental(
+                    sunspots=tracks[stat_type],
+                    images=load_images,
+                    headers=headers,
+                    store=store,
+                    quantity=quantity,
+                    frame_ids=metadata["filename_list"],
+                    min_step=min_step,
+                    take_abs=quantity in ["Bp", "Bt"],
+                    flux_engine=flux_engine,
+                    lonlat_method=lonlat_method,
+                    stat_names=stat_names
+                )
+                print(store)
+            elif n_workers != 1:
+                stats[stat_type][quantity] = compute_sunspot_statistics_parallel(
+                    sunspots=tracks[stat_type],
+                    images=load_images(),
+                    headers=headers,
+                    min_step=min_step,
+                    take_abs=quantity in ["Bp", "Bt"],
+                    flux_engine=flux_engine,
+                    lonlat_method=lonlat_method,
+                    stat_names=stat_names,
+                    n_workers=n_workers,
+                    chunk_size=chunk_size,
+                    memory_per_worker_gb=memory_per_worker_gb
+                )
+            else:
+                stats[stat_type][quantity] = compute_sunspot_statistics_evolution(
+                    sunspots=tracks[stat_type],
+                    images=load_images(),
+                    headers=headers,
+                    min_step=min_step,
+                    take_abs=quantity in ["Bp", "Bt"],
+                    flux_engine=flux_engine,
+                    lonlat_method=lonlat_method,
+                    stat_names=stat_names
+                )
+            print(format_header_cache_info())
+
+        if incremental:
+            store.save()
 
     return tracks, stats, metadata
+
+
+def stream_stats_from_contours(
+        contour_file: str,
+        output_files: dict[str, str],
+        observation_id: str,
+        quantities: list[Literal["Ic", "B", "Bp", "Bt", "Br", "Bhor"]],
+        header_index: int = 0,
+        min_step: float = 0.5,
+        flux_engine: Literal["dense", "sparse"] = "dense",
+        lonlat_method: Literal["astropy", "numpy"] = "astropy",
+        stat_names: list[str] | None = None,
+        chunk_size: int = 8,
+) -> tuple[dict, dict]:
+    """
+    Compute the statistics in chunks of chunk_size frames and stream them as flat rows
+    (see `flatten_spot_frame`) to one Parquet file per stat type, one row group per chunk.
+    Only the frames of the current chunk are in memory, and nothing is accumulated.
+
+    Image-independent statistics are computed with the first quantity only; the other
+    quantities add their fluxes.
+
+    Parameters:
+        output_files: {stat_type: Parquet filename}.
+        observation_id: Value of the "observation_id" column.
+
+    Returns: tracks, metadata
+    """
+    tracks, _, metadata = load_tracks_and_stats(contour_file)
+    metadata |= {
+        "contour_path": contour_file,
+        "quantities": quantities,
+        "stat_types": list(output_files),
+        "header_index": header_index,
+        "min_step": min_step,
+        "flux_engine": flux_engine,
+        "lonlat_method": lonlat_method,
+        "stat_names": stat_names,
+        "flat_stats_files": output_files,
+    }
+    headers = load_fits_headers(
+        metadata["filename_list"],
+        header_index=header_index
+    )
+
+    plan = plan_stats(stat_names)
+    flux_stats = [stat for stat in plan.stats if "image" in STAT_REGISTRY[stat].inputs]
+    columns = flat_stats_columns(quantities, stat_names)
+
+    spot_frames = {
+        stat_type: {
+            sid: set(group.get("outer", {}).keys()) | set(group.get("inner", {}).keys())
+            for sid, group in tracks[stat_type].items()
+        }
+        for stat_type in output_files
+    }
+    frames = sorted(set().union(*(set().union(*spots.values()) for spots in spot_frames.values())))
+
+    writers = {stat_type: FlatStatsWriter(filename, columns) for stat_type, filename in output_files.items()}
+    try:
+        for i in tqdm(range(0, len(frames), chunk_size)):
+            chunk = frames[i:i + chunk_size]
+            stats = {stat_type: {} for stat_type in output_files}
+
+            for iq, quantity in enumerate(quantities):
+                if iq > 0 and not flux_stats:
+                    break
+                images = {t: load_image(metadata["filename_list"][t], quantity) for t in chunk}
+
+                for stat_type, spots in spot_frames.items():
+                    stats[stat_type][quantity] = compute_sunspot_statistics_evolution(
+                        sunspots=tracks[stat_type],
+                        images=images,
+                        headers=headers,
+                        min_step=min_step,
+                        take_abs=quantity in ["Bp", "Bt"],
+                        flux_engine=flux_engine,
+                        lonlat_method=lonlat_method,
+                        stat_names=stat_names if iq == 0 else flux_stats,
+                        only=[(sid, t) for sid, sid_frames in spots.items() for t in chunk if t in sid_frames],
+                        progress=False
+                    )
+
+            for stat_type, spots in spot_frames.items():
+                writers[stat_type].write_rows(
+                    flatten_spot_frame(observation_id, sid, t, stats[stat_type])
+                    for sid, sid_frames in spots.items() for t in chunk if t in sid_frames
+                )
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    print(format_header_cache_info())
+
+    return tracks, metadata
@@ -2,10 +2,15 @@ from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from typing import Callable, Iterable, Iterator
+from typing import Callable, Iterable, Iterator, Literal, TypeVar
 
 from scr.plotting.scene.frame_data import FrameData
-from scr.plotting.scene.render import render_scene
+from scr.plotting.scene.render import render_frame_data
+from scr.plotting.scene.persistent import PersistentScene
+from scr.plotting.animation.parallel import render_frames_parallel
+
+
+T = TypeVar("T")
 
 
 def animate_frames(
@@ -17,9 +22,13 @@ def animate_frames(
         dpi: int = 100,
         figsize: tuple[float, float] = (8, 8),
         animation_kwargs: dict | None = None,
+        clear: bool = True,
 ) -> FuncAnimation:
     """
     Animate a sequence or generator of FrameData using draw_frame.
+
+    clear: clear the Axes before every frame; otherwise draw_frame updates the previous frame
+        (e.g. `PersistentScene`) and returns the artists of the scene.
     """
     if animation_kwargs is None:
         animation_kwargs = {}
@@ -27,6 +36,9 @@ def animate_frames(
     fig, ax = plt.subplots(figsize=figsize)
 
     def update(frame: FrameData) -> Iterable[Artist]:
+        if not clear:
+            return draw_frame(ax, frame)
+
         ax.clear()
         draw_frame(ax, frame)
         return ax.artists
@@ -54,21 +66,34 @@ def animate_frames_from_generator(
         dpi: int = 100,
         figsize: tuple[float, float] = (8, 8),
         animation_kwargs: dict | None = None,
+        scene: Literal["redraw", "persistent"] = "redraw",
 ) -> FuncAnimation:
     """
     Animate frames provided as a generator or iterable of FrameData.
+
+    scene:
+        "redraw": clear the Axes and render the scene of every frame from scratch.
+        "persistent": update the artists of the previous frame (see `PersistentScene`), much cheaper
+            per frame with many contour groups; contours may differ from "redraw" by a few edge pixels.
     """
+    if scene not in ("redraw", "persistent"):
+        raise ValueError(f"Unknown scene '{scene}'. Available options are 'redraw' and 'persistent'.")
+
+    if scene == "persistent":
+        return animate_frames(
+            frames=frames,
+            draw_frame=PersistentScene(),
+            save_path=save_path,
+            interval=interval,
+            dpi=dpi,
+            figsize=figsize,
+            animation_kwargs=animation_kwargs,
+            clear=False,
+        )
+
     def draw_frame(ax: Axes, frame: FrameData) -> Iterable[Artist]:
         ax.clear()
-        render_scene(
-            ax,
-            image=frame.image,
-            contour_groups=frame.contour_groups,
-            image_kwargs=frame.image_kwargs,
-            contour_kwargs=frame.contour_kwargs,
-            annotations=frame.annotations,
-        )
-        ax.axis("off")
+        render_frame_data(ax, frame)
         return ax.artists
 
     return animate_frames(
@@ -80,3 +105,54 @@ def animate_frames_from_generator(
         figsize=figsize,
         animation_kwargs=animation_kwargs,
     )
+
+
+def animate_frame_items(
+        *,
+        items: Iterable[T],
+        build_frame: Callable[[T], FrameData],
+        save_path: str,
+        interval: int = 200,
+        dpi: int = 100,
+        figsize: tuple[float, float] = (8, 8),
+        backend: Literal["serial", "parallel"] = "serial",
+        scene: Literal["redraw", "persistent"] = "redraw",
+        n_workers: int | None = None,
+        max_in_flight: int | None = None,
+) -> None:
+    """
+    Animate the frames built from items (e.g. FrameSpec with a `FrameDataBuilder`).
+
+    backend:
+        "serial": build and draw the frames one by one (`animate_frames_from_generator`).
+        "parallel": build and draw them on n_workers processes, piping the frames into ffmpeg in order
+            with at most max_in_flight frames pending (see `render_frames_parallel`).
+    scene: as in `animate_frames_from_generator` (with the parallel backend, a scene per worker).
+    """
+    if backend == "serial":
+        animate_frames_from_generator(
+            frames=map(build_frame, items),
+            save_path=save_path,
+            interval=interval,
+            dpi=dpi,
+            figsize=figsize,
+            scene=scene,
+        )
+    elif backend == "parallel":
+        if scene not in ("redraw", "persistent"):
+            raise ValueError(f"Unknown scene '{scene}'. Available options are 'redraw' and 'persistent'.")
+
+        render_frames_parallel(
+            items,
+            build_frame,
+            save_path,
+            interval=interval,
+            dpi=dpi,
+            figsize=figsize,
+            draw_frame=PersistentScene() if scene == "persistent" else render_frame_data,
+            clear=scene == "redraw",
+            n_workers=n_workers,
+            max_in_flight=max_in_flight,
+        )
+    else:
+        raise ValueError(f"Unknown backend '{backend}'. Available options are 'serial' and 'parallel'.")
@@ -0,0 +1,229 @@
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import numpy as np
+import matplotlib as mpl
+from collections import deque
+from itertools import islice
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from matplotlib.animation import adjusted_figsize
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from typing import Callable, Iterable, TypeVar
+
+from scr.plotting.scene.frame_data import FrameData
+from scr.plotting.scene.render import render_frame_data
+
+
+T = TypeVar("T")
+
+# per-process rendering state, set by `_init_renderer` (cleared after rendering in the calling process)
+_renderer: dict = {}
+
+
+def _init_renderer(
+        build_frame: Callable[[T], FrameData],
+        draw_frame: Callable[[Axes, FrameData], object],
+        figsize: tuple[float, float],
+        dpi: int,
+        clear: bool,
+) -> None:
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+
+    _renderer.update(
+        build_frame=build_frame,
+        draw_frame=draw_frame,
+        fig=fig,
+        ax=fig.add_subplot(),
+        clear=clear,
+    )
+
+
+def _render_frame(item: T) -> tuple[int, int, bytes]:
+    # (width, height, RGB bytes) of one frame, drawn on the figure of the process
+    fig, ax = _renderer["fig"], _renderer["ax"]
+
+    if _renderer["clear"]:
+        ax.clear()
+    _renderer["draw_frame"](ax, _renderer["build_frame"](item))
+    fig.canvas.draw()
+
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    return rgba.shape[1], rgba.shape[0], rgba[..., :3].tobytes()
+
+
+class _SerialExecutor(Executor):
+    # renders in the calling process, for n_workers=1
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+def ffmpeg_command(
+        save_path: str,
+        frame_size: tuple[int, int],
+        fps: float,
+        codec: str = "h264",
+        extra_args: list[str] | None = None,
+) -> list[str]:
+    """
+    ffmpeg command line encoding raw RGB frames of frame_size (width, height) read from stdin,
+    as matplotlib's FFMpegWriter (binary and extra arguments from the "animation.ffmpeg_*" rcParams).
+    """
+    if extra_args is None:
+        extra_args = mpl.rcParams["animation.ffmpeg_args"]
+
+    output_args = ["-vcodec", codec]
+    if codec == "h264" and "-pix_fmt" not in extra_args:
+        output_args += ["-pix_fmt", "yuv420p"]
+
+    return [
+        mpl.rcParams["animation.ffmpeg_path"],
+        "-f", "rawvideo", "-vcodec", "rawvideo",
+        "-s", "%dx%d" % frame_size, "-pix_fmt", "rgb24",
+        "-framerate", str(fps),
+        "-loglevel", "error",
+        "-i", "pipe:",
+        *output_args, *extra_args,
+        "-y", save_path,
+    ]
+
+
+def render_frames_parallel(
+        items: Iterable[T],
+        build_frame: Callable[[T], FrameData],
+        save_path: str,
+        *,
+        draw_frame: Callable[[Axes, FrameData], object] = render_frame_data,
+        clear: bool = True,
+        interval: int = 200,
+        dpi: int = 100,
+        figsize: tuple[float, float] = (8, 8),
+        n_workers: int | None = None,
+        max_in_flight: int | None = None,
+        codec: str = "h264",
+        ffmpeg_args: list[str] | None = None,
+) -> int:
+    """
+    Render frames on a process pool and encode them with ffmpeg, as `animate_frames` would.
+
+    Every worker builds the FrameData of an item with build_frame (so the images are read in the
+    workers), draws it with draw_frame on its own Agg figure and returns the RGB buffer. The buffers are
+    piped into ffmpeg's stdin in the order of items while at most max_in_flight frames are being rendered
+    or waiting to be written, which bounds the memory whatever the number of frames.
+
+    Parameters
+    ----------
+    items : iterable
+        Frame items (e.g. FrameSpec), consumed lazily; they are sent to the workers, so must be picklable.
+    build_frame : callable
+        item -> FrameData (e.g. `FrameDataBuilder`). With the "fork" start method (the default where
+        available), build_frame and draw_frame are inherited by the workers and may be closures;
+        otherwise they must be picklable.
+    clear : bool
+        Clear the Axes before every frame, as `animate_frames`; False for draw_frame updating the previous
+        frame of the worker (e.g. `PersistentScene`).
+    n_workers : int, optional
+        Number of rendering processes; os.cpu_count() if None. 1 renders in the calling process.
+    max_in_flight : int, optional
+        Maximum number of frames submitted but not yet written; 2 * n_workers if None.
+    codec, ffmpeg_args
+        Video codec and extra output arguments of ffmpeg (see `ffmpeg_command`).
+
+    Returns
+    -------
+    int
+        Number of frames written.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * n_workers
+    if n_workers < 1 or max_in_flight < 1:
+        raise ValueError(f"n_workers and max_in_flight must be positive, got {n_workers} and {max_in_flight}")
+
+    if codec == "h264":
+        # yuv420p needs even frame dimensions
+        figsize = adjusted_figsize(*figsize, dpi, 2)
+
+    renderer_args = (build_frame, draw_frame, figsize, dpi, clear)
+
+    if n_workers == 1:
+        _init_renderer(*renderer_args)
+        executor = _SerialExecutor()
+    else:
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_renderer,
+            initargs=renderer_args,
+        )
+
+    def submit(n: int) -> None:
+        pending.extend(executor.submit(_render_frame, item) for item in islice(items, n))
+
+    items = iter(items)
+    pending = deque()
+    n_frames = 0
+    proc = None
+
+    with executor, tempfile.TemporaryFile() as stderr:
+        try:
+            submit(max_in_flight)
+
+            while pending:
+                width, height, rgb = pending.popleft().result()
+                submit(1)
+
+                if proc is None:
+                    command = ffmpeg_command(
+                        save_path,
+                        frame_size=(width, height),
+                        fps=1000 / interval,
+                        codec=codec,
+                        extra_args=ffmpeg_args,
+                    )
+                    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+
+                try:
+                    proc.stdin.write(rgb)
+                except BrokenPipeError:
+                    # ffmpeg exited, its error is raised below
+                    break
+                n_frames += 1
+
+        except BaseException:
+            if proc is not None:
+                proc.kill()
+            raise
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+            if n_workers == 1:
+                # do not keep the figure and build_frame alive in the calling process
+                _renderer.clear()
+
+            if proc is not None:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+                proc.wait()
+
+        if proc is not None and proc.returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(
+                proc.returncode, proc.args, stderr=stderr.read().decode(errors="replace")
+            )
+
+    return n_frames
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Iterable, Mapping, Callable, Iterator, Literal
 from matplotlib.axes import Axes
 
@@ -7,6 +8,33 @@ from scr.plotting.scene.frame_data import FrameData
 from scr.plotting.builders.frames import frame_data_from_observation
 
 
+@dataclass(frozen=True)
+class FrameDataBuilder:
+    """
+    Build the FrameData of a FrameSpec (see `frame_data_from_observation`) from fixed sources.
+
+    Unlike a generator, a builder can be handed to rendering workers that build the frames
+    (and read the images) themselves.
+    """
+    contour_source: Mapping
+    quantity: Literal["Ic", "B", "Bp", "Bt", "Br", "Bver", "Bhor"]
+    contour_parser: Callable[..., list[ContourGroup]]
+    style_resolver: Callable[..., dict] | None = None
+    annotations: Callable[[Axes, list[ContourGroup]], None] | None = None
+
+    def __call__(self, spec: FrameSpec) -> FrameData:
+        return frame_data_from_observation(
+            observation_id=spec.observation_id,
+            frame=spec.frame,
+            image_path=spec.image_path,
+            quantity=self.quantity,
+            contour_source=self.contour_source,
+            contour_parser=self.contour_parser,
+            style_resolver=self.style_resolver,
+            annotations=self.annotations,
+        )
+
+
 def iter_frame_data(
         *,
         frame_specs: Iterable[FrameSpec],
@@ -19,18 +47,13 @@ def iter_frame_data(
     """
     Yield FrameData for each provided FrameSpec.
     """
+    build_frame = FrameDataBuilder(
+        contour_source=contour_source,
+        quantity=quantity,
+        contour_parser=contour_parser,
+        style_resolver=style_resolver,
+        annotations=annotations,
+    )
+
     for spec in frame_specs:
-        observation_id = spec.observation_id
-        frame = spec.frame
-        image_path = spec.image_path
-
-        yield frame_data_from_observation(
-            observation_id=observation_id,
-            frame=frame,
-            image_path=image_path,
-            quantity=quantity,
-            contour_source=contour_source,
-            contour_parser=contour_parser,
-            style_resolver=style_resolver,
-            annotations=annotations,
-        )
+        yield build_frame(spec)
@@ -0,0 +1,132 @@
+import numpy as np
+import matplotlib as mpl
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.image import AxesImage
+
+from scr.plotting.scene.frame_data import FrameData
+from scr.plotting.generic.image import plot_image
+
+
+def _style_key(style: dict) -> tuple:
+    # hashable identity of a contour style (colors may be arrays)
+    return tuple(sorted(
+        (key, tuple(np.ravel(value)) if isinstance(value, (list, tuple, np.ndarray)) else value)
+        for key, value in style.items()
+    ))
+
+
+class PersistentScene:
+    """
+    Draw successive FrameData on one Axes by updating the same artists instead of clearing the Axes and
+    re-rendering the scene (`render_frame_data`) every frame:
+
+    - the image is created once and updated with set_data (color limits from image_kwargs, otherwise
+      autoscaled to every image, as a new imshow); cmap, origin etc. are those of the first frame;
+    - the contours of all groups sharing a style are drawn by one LineCollection, updated with
+      set_segments and the style (color, linestyle, linewidth, alpha); the collections are reused
+      across frames whatever their style;
+    - annotations are still called every frame, the artists they created for the previous frame removed.
+
+    A scene is the draw_frame of `animate_frames` with clear=False (bound to the Axes of its first call)
+    and returns the artists of the scene. Contour styles may only use properties of
+    LineCollection, and line caps are those of collections, so contours can differ from `plot_contours`
+    by a few edge pixels.
+    """
+
+    def __init__(self):
+        self.ax: Axes | None = None
+        self.image: AxesImage | None = None
+        self.collections: list[LineCollection] = []
+        self.annotation_artists: list[Artist] = []
+
+    def __call__(self, ax: Axes, frame: FrameData) -> list[Artist]:
+        if self.ax is None:
+            self.ax = ax
+            ax.axis("off")
+        elif ax is not self.ax:
+            raise ValueError("PersistentScene is bound to another Axes.")
+
+        self._update_image(frame)
+        self._update_contours(frame)
+        self._update_annotations(frame)
+
+        if self.image is not None and self.image.get_visible():
+            ax.set_xlim(self.image.get_extent()[:2])
+            ax.set_ylim(self.image.get_extent()[2:])
+        else:
+            ax.ignore_existing_data_limits = True
+            for collection in self.collections:
+                if collection.get_visible() and collection.get_segments():
+                    ax.update_datalim(np.concatenate(collection.get_segments()))
+            ax.autoscale_view()
+
+        image = [self.image] if self.image is not None else []
+        return image + self.collections + self.annotation_artists
+
+    def _update_image(self, frame: FrameData) -> None:
+        if frame.image is None:
+            if self.image is not None:
+                self.image.set_visible(False)
+            return
+
+        if self.image is None:
+            self.image = plot_image(self.ax, frame.image, image_kwargs=frame.image_kwargs)
+            return
+
+        image_kwargs = frame.image_kwargs or {}
+        self.image.set_data(frame.image)
+        self.image.set_visible(True)
+
+        data = self.image.get_array()
+        self.image.set_clim(
+            data.min() if image_kwargs.get("vmin") is None else image_kwargs["vmin"],
+            data.max() if image_kwargs.get("vmax") is None else image_kwargs["vmax"],
+        )
+
+    def _update_contours(self, frame: FrameData) -> None:
+        default_contour_kwargs = frame.contour_kwargs or {}
+
+        # {style key: (style, segments in (x, y))}, in order of first appearance
+        styled_segments: dict[tuple, tuple[dict, list[np.ndarray]]] = {}
+        for group in frame.contour_groups:
+            style = default_contour_kwargs | group.style
+            _, segments = styled_segments.setdefault(_style_key(style), (style, []))
+
+            for contour in group.contours:
+                if np.ndim(contour) != 2 or np.shape(contour)[1] != 2:
+                    raise ValueError("Each contour must have shape (N, 2)")
+                segments.append(np.asarray(contour)[:, ::-1])  # (row, col) -> (x, y)
+
+        while len(self.collections) < len(styled_segments):
+            collection = LineCollection([])
+            self.ax.add_collection(collection, autolim=False)
+            self.collections.append(collection)
+
+        for collection, (style, segments) in zip(self.collections, styled_segments.values()):
+            # the defaults reset what the previous style of the collection set
+            collection.set_segments(segments)
+            collection.set(**{
+                "color": mpl.rcParams["lines.color"],
+                "linestyle": mpl.rcParams["lines.linestyle"],
+                "linewidth": mpl.rcParams["lines.linewidth"],
+                "alpha": None,
+            } | style)
+            collection.set_visible(True)
+
+        for collection in self.collections[len(styled_segments):]:
+            collection.set_segments([])
+            collection.set_visible(False)
+
+    def _update_annotations(self, frame: FrameData) -> None:
+        for artist in self.annotation_artists:
+            artist.remove()
+        self.annotation_artists = []
+
+        if frame.annotations is None:
+            return
+
+        existing = set(self.ax.get_children())
+        frame.annotations(self.ax, frame.contour_groups)
+        self.annotation_artists = [artist for artist in self.ax.get_children() if artist not in existing]
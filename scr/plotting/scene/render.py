@@ -4,6 +4,7 @@ from matplotlib.image import AxesImage
 from typing import Sequence, Callable, Literal
 
 from scr.plotting.types import ContourGroup
+from scr.plotting.scene.frame_data import FrameData
 from scr.plotting.generic.image import plot_image
 from scr.plotting.composite.contours import plot_contour_groups
 
@@ -52,3 +53,21 @@ def render_scene(
 
     if return_image:
         return im
+
+
+def render_frame_data(
+        ax: Axes,
+        frame: FrameData,
+) -> None:
+    """
+    Render the scene of a FrameData on one Axes (see `render_scene`), without axis decorations.
+    """
+    render_scene(
+        ax,
+        image=frame.image,
+        contour_groups=frame.contour_groups,
+        image_kwargs=frame.image_kwargs,
+        contour_kwargs=frame.contour_kwargs,
+        annotations=frame.annotations,
+    )
+    ax.axis("off")
@@ -1,29 +1,79 @@
+import numpy as np
 import pandas as pd
-from copy import deepcopy
 
-from scr.utils.types_alias import ObservationID, Sunspots, SunspotsPhasesByObservation
+from scr.utils.types_alias import ObservationID, SunspotID, SunspotPhase, Sunspots, SunspotsPhasesByObservation
 from scr.utils.collections import nested_defaultdict
 
 
+PHASES = ("forming", "stable", "decaying")
+
+PhaseFramesByObservation = dict[ObservationID, dict[SunspotID, dict[SunspotPhase, np.ndarray]]]
+
+
+def phase_frame_indices(
+        combined_df: pd.DataFrame
+) -> PhaseFramesByObservation:
+    """
+    Frames of every (observation_id, sunspot_id, phase) group of rows in a known phase (case-insensitive),
+    as {observation_id: {sunspot_id: {phase: frames}}} with the frames in row order.
+    """
+    phase = combined_df["phase"].astype(str)
+    known = phase.str.lower().isin(PHASES).to_numpy()
+    df = combined_df.loc[known, ["observation_id", "sunspot_id", "frame"]].copy()
+    df["phase"] = phase.to_numpy()[known]
+
+    phase_frames = nested_defaultdict(depth=2)
+    if df.empty:
+        return phase_frames
+
+    # rows grouped stably by group number (in order of first appearance)
+    codes = df.groupby(["observation_id", "sunspot_id", "phase"], sort=False, observed=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+    frames = np.split(df["frame"].to_numpy()[order], starts[1:])
+
+    first_rows = order[starts]
+    for fid, sid, ph, group_frames in zip(
+            df["observation_id"].to_numpy()[first_rows],
+            df["sunspot_id"].to_numpy()[first_rows],
+            df["phase"].to_numpy()[first_rows],
+            frames
+    ):
+        phase_frames[fid][int(sid)][ph] = group_frames
+
+    return phase_frames
+
+
 def split_by_phase(
         combined_df: pd.DataFrame,
         all_contours: dict[ObservationID, Sunspots],
-) -> SunspotsPhasesByObservation:
+        as_indices: bool = False
+) -> SunspotsPhasesByObservation | PhaseFramesByObservation:
+    """
+    Split the contours of all_contours by the phase of their (observation_id, sunspot_id, frame) row.
+
+    The contour lists are shared with all_contours (not copied), so cast their dtype beforehand if needed.
+    With as_indices=True, return the frames of every phase instead (see `phase_frame_indices`).
+    """
+    phase_frames = phase_frame_indices(combined_df)
+    if as_indices:
+        return phase_frames
+
     phase_contours = nested_defaultdict(depth=2)
 
-    for _, row in combined_df.iterrows():
-        ph = row.phase
-        if ph.lower() not in ["forming", "stable", "decaying"]:
-            continue
-        fid, sid, frame = row.observation_id, row.sunspot_id, row.frame
-
-        # Copy contours
-        spot = all_contours[fid].get(sid, {})
-        for region in ("inner", "outer"):
-            if frame in spot.get(region, {}):
-                phase_contours[fid] \
-                    .setdefault(sid, {}) \
-                    .setdefault(ph, {}) \
-                    .setdefault(region, {})[frame] = deepcopy(spot[region][frame])
+    for fid, spots in phase_frames.items():
+        for sid, phases in spots.items():
+            spot = all_contours[fid].get(sid, {})
+
+            for ph, frames in phases.items():
+                for region in ("inner", "outer"):
+                    track = spot.get(region, {})
+                    shared = {int(frame): track[frame] for frame in frames if frame in track}
+                    if shared:
+                        phase_contours[fid] \
+                            .setdefault(sid, {}) \
+                            .setdefault(ph, {}) \
+                            .setdefault(region, {}) \
+                            .update(shared)
 
     return phase_contours
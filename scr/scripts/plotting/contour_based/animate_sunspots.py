@@ -3,14 +3,17 @@ import numpy as np
 from typing import Literal
 
 from scr.config.paths import PATH_CONTOURS_PHASES, PATH_VIDEOS
+from scr.config.filtering import gimme_filtering_kwargs
 from scr.utils.filesystem import check_dir
 
+from scr.io.phase_dataset import MANIFEST_FILE
 from scr.pipelines.io.load_phase_tracks import load_filtered_phase_tracks
+from scr.pipelines.io.phase_dataset import load_phase_dataset
 from scr.postanalysis.selection.sunspots import apply_standard_sunspots_phases_filter
 
 from scr.plotting.scene.frame_spec import FrameSpec
-from scr.plotting.animation.animate import animate_frames_from_generator
-from scr.plotting.builders.frame_generators import iter_frame_data
+from scr.plotting.animation.animate import animate_frame_items
+from scr.plotting.builders.frame_generators import FrameDataBuilder
 from scr.plotting.scene.parsers import contour_groups_from_sunspot_phases
 
 from scr.plotting.style.resolvers import sunspot_phase_style_resolver
@@ -33,21 +36,45 @@ def main():
 
     interval = 150  # ms between frames
 
+    n_workers = 1  # > 1: render the frames on a process pool
+    # "persistent": reuse the artists of the previous frame, faster but contours may differ by a few pixels
+    scene: Literal["redraw", "persistent"] = "redraw"
+
     out = path.join(PATH_VIDEOS, f"{QUANTITY}_{MODE}_{obs_index}.mp4")
     check_dir(out, is_file=True)
 
     # ------------------------------------------------------------------
     # Load phase-tracked contours and metadata
     # ------------------------------------------------------------------
-    contours_phases, df = load_filtered_phase_tracks(
-        nosuffix_filename=path.join(PATH_CONTOURS_PHASES, "all_sunspots_phases"),
-        mode=MODE,
-        drop_unknown=True,
-    )
+    nosuffix_filename = path.join(PATH_CONTOURS_PHASES, "all_sunspots_phases")
+
+    if path.isfile(path.join(nosuffix_filename, MANIFEST_FILE)):
+        # partitioned dataset: pick the observation from the filtered IDs, then open only its partition
+        _, ids = load_phase_dataset(
+            nosuffix_filename,
+            columns=["observation_id"],
+            filtering_kwargs=gimme_filtering_kwargs(MODE),
+            drop_unknown=True,
+            load_contours=False,
+        )
+        observation_id = np.unique(ids["observation_id"])[obs_index]
+
+        contours_phases, df_obs = load_phase_dataset(
+            nosuffix_filename,
+            observation_ids=[observation_id],
+            filtering_kwargs=gimme_filtering_kwargs(MODE),
+            drop_unknown=True,
+        )
+    else:
+        contours_phases, df = load_filtered_phase_tracks(
+            nosuffix_filename=nosuffix_filename,
+            mode=MODE,
+            drop_unknown=True,
+        )
 
-    observation_id = np.unique(df["observation_id"])[obs_index]
-    df_obs = df[df["observation_id"] == observation_id]
-    del df
+        observation_id = np.unique(df["observation_id"])[obs_index]
+        df_obs = df[df["observation_id"] == observation_id]
+        del df
 
     contour_source = apply_standard_sunspots_phases_filter(
         contours_phases,
@@ -90,10 +117,9 @@ def main():
     )
 
     # ------------------------------------------------------------------
-    # Build the frame generator
+    # Define how a frame is built (image read + contour groups)
     # ------------------------------------------------------------------
-    frame_iter = iter_frame_data(
-        frame_specs=frame_specs,
+    build_frame = FrameDataBuilder(
         contour_source=contour_source,
         contour_parser=contour_groups_from_sunspot_phases,
         style_resolver=style_resolver,
@@ -104,10 +130,14 @@ def main():
     # ------------------------------------------------------------------
     # Animate and save
     # ------------------------------------------------------------------
-    animate_frames_from_generator(
-        frames=frame_iter,
+    animate_frame_items(
+        items=frame_specs,
+        build_frame=build_frame,
         save_path=out,
         interval=interval,
+        backend="serial" if n_workers == 1 else "parallel",
+        scene=scene,
+        n_workers=n_workers,
     )
 
 
@@ -13,8 +13,7 @@ from scr.config.figures import FIG_FORMAT, SAVEFIG_KWARGS, CBAR_KWARGS
 
 from scr.utils.filesystem import check_dir
 from scr.geometry.solar.units import pixelarea_to_Mm2
-from scr.io.parquet import load_parquet
-from scr.stats.dataframe.filtering import filter_combined_df
+from scr.pipelines.io.load_phase_tracks import load_filtered_phase_table
 
 from scr.plotting.generic.hist import plot_hist2d
 from scr.plotting.style.latex import latex_style
@@ -41,10 +40,11 @@ def main():
     # ------------------------------------------------------------------
     # Load and filter combined phase data
     # ------------------------------------------------------------------
-    df = load_parquet(
-        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet")
+    df = load_filtered_phase_table(
+        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet"),
+        filtering_kwargs=gimme_filtering_kwargs(MODE),
+        columns=["overall_corrected_total_area", spec.mean_col, spec.std_col],
     )
-    df = filter_combined_df(df, gimme_filtering_kwargs(MODE))
 
     # ------------------------------------------------------------------
     # Prepare quantities for plotting
@@ -11,7 +11,7 @@ from scr.config.quantities import get_quantity_spec
 from scr.config.figures import FIG_FORMAT, SAVEFIG_KWARGS
 
 from scr.utils.filesystem import check_dir
-from scr.io.parquet import load_parquet
+from scr.pipelines.io.load_phase_tracks import load_filtered_phase_table
 from scr.stats.dataframe.filtering import filter_combined_df
 
 from scr.plotting.generic.hist import plot_pdfs, overlay_gaussian_fit
@@ -38,10 +38,11 @@ def main():
     # ------------------------------------------------------------------
     # Load and filter combined phase data
     # ------------------------------------------------------------------
-    df = load_parquet(
-        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet")
+    df = load_filtered_phase_table(
+        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet"),
+        filtering_kwargs=gimme_filtering_kwargs(MODE),
+        columns=["phase", spec.mean_col, spec.std_col],
     )
-    df = filter_combined_df(df, gimme_filtering_kwargs(MODE))
 
     # ------------------------------------------------------------------
     # Extract phase-wise distributions
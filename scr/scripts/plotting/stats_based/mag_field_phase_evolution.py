@@ -11,8 +11,7 @@ from scr.config.quantities import get_quantity_spec
 from scr.config.figures import FIG_FORMAT, SAVEFIG_KWARGS
 
 from scr.utils.filesystem import check_dir
-from scr.io.parquet import load_parquet
-from scr.stats.dataframe.filtering import filter_combined_df
+from scr.pipelines.io.load_phase_tracks import load_filtered_phase_table
 from scr.stats.segments.phase import extract_phase_segments, median_curve
 
 from scr.plotting.generic.lines import plot_line
@@ -42,10 +41,11 @@ def main():
     # ------------------------------------------------------------------
     # Load and filter data
     # ------------------------------------------------------------------
-    df = load_parquet(
-        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet")
+    df = load_filtered_phase_table(
+        path.join(PATH_CONTOURS_PHASES, f"all_{MODE}_phases_merged.parquet"),
+        filtering_kwargs=gimme_filtering_kwargs(MODE),
+        columns=["spot_global_index", "frame", "phase", spec.mean_col],
     )
-    df = filter_combined_df(df, gimme_filtering_kwargs(MODE))
 
     # Extract time-normalised segments for each phase
     segments = {
@@ -4,16 +4,19 @@ from typing import Literal
 
 from scr.config.paths import PATH_CONTOURS
 
+from scr.utils.nested import nested_update
+
 from scr.io.tracks import load_tracks_and_stats, save_tracks_and_stats
 from scr.io.fits.read import load_fits_headers, load_image
 
 from scr.stats.computation.evolution import compute_sunspot_statistics_evolution
+from scr.stats.computation.registry import STAT_REGISTRY
 from scr.stats.postprocessing.propagation import propagate_stat_parameter
 
 
 def main() -> None:
     QUANTITIY: Literal["Ic", "B", "Bp", "Bt", "Br", "Bver", "Bhor"] = "Bhor"
-    PROPAGATED_PARAMETER = "fractal_dimensions"
+    PROPAGATED_STAT = "fractal_dimension"  # see STAT_REGISTRY
 
     contour_files = sorted(glob(path.join(PATH_CONTOURS, "*.npz")))
 
@@ -29,16 +32,19 @@ def main() -> None:
                 headers=headers,
                 min_step=0.5,
                 take_abs=QUANTITIY in ["Bp", "Bt"],
-                images=images
+                images=images,
+                stat_names=[PROPAGATED_STAT]
             )
 
-            stats.setdefault(mode, {})[QUANTITIY] = quantity_stats
-            propagate_stat_parameter(
-                stats[mode],
-                source_quantity=QUANTITIY,
-                target_quantities=["Ic", "B", "Bp", "Bt", "Br", "Bhor"],
-                param=PROPAGATED_PARAMETER,
-            )
+            # only the propagated statistic (and its dependencies) was recomputed; keep the rest
+            nested_update(stats.setdefault(mode, {}).setdefault(QUANTITIY, {}), quantity_stats)
+            for param in STAT_REGISTRY[PROPAGATED_STAT].outputs:
+                propagate_stat_parameter(
+                    stats[mode],
+                    source_quantity=QUANTITIY,
+                    target_quantities=["Ic", "B", "Bp", "Bt", "Br", "Bhor"],
+                    param=param,
+                )
 
         save_tracks_and_stats(
             filename=contour_file.replace(".npz", "_NEW.npz"),
@@ -1,22 +1,23 @@
 import numpy as np
 from tqdm import tqdm
-from typing import Sequence
+from typing import Collection, Sequence, Literal
 
-from scr.utils.types_alias import Sunspots, Stats, Headers
+from scr.utils.types_alias import Contours, Masks, Stat, Sunspots, Stats, Headers, SunspotID, FrameID
 from scr.utils.filesystem import is_empty
 
 from scr.geometry.contours.sampling import sample_map_at_contour
 from scr.geometry.contours.utils import contour_to_shape
+from scr.geometry.solar.coordinates import SolarCoordinates
 from scr.geometry.solar.mu import compute_mu
-from scr.geometry.solar.projection import pixel_to_lonlat
 
 from scr.morphology.masks import compute_masks
 
-from scr.stats.computation.geometry import compute_geometry_stats, compute_corrected_total_area
+from scr.stats.computation.geometry import compute_geometry_stats, GEOMETRY_STATS
 from scr.stats.computation.masks import overall_mask, corr_mask
 from scr.stats.computation.flux import compute_flux_area_stats, compute_flux_length_stats
+from scr.stats.computation.sparse import MaskMatrixBuilder, compute_mask_matrix_flux_stats
 from scr.stats.computation.ratio import compute_ratio_stats
-from scr.stats.computation.mu import compute_mu_stats
+from scr.stats.computation.registry import StatPlan, plan_stats
 from scr.stats.computation.utils import nanaverage, safe_call
 
 
@@ -25,7 +26,12 @@ def compute_sunspot_statistics_evolution(
         images: Sequence[np.ndarray],
         headers: Headers,
         min_step: float = 0.5,
-        take_abs: bool = False
+        take_abs: bool = False,
+        flux_engine: Literal["dense", "sparse"] = "dense",
+        lonlat_method: Literal["astropy", "numpy"] = "astropy",
+        stat_names: Sequence[str] | None = None,
+        only: Collection[tuple[SunspotID, FrameID]] | None = None,
+        progress: bool = True
 ) -> Stats:
     """
     Compute geometric and intensity-based statistics for umbra and penumbra
@@ -43,56 +49,100 @@ def compute_sunspot_statistics_evolution(
         headers: List of FITS headers, one per frame, used to compute mu map.
         min_step: Maximum distance between contour points.
         take_abs: Whether to take absolute value of the field before flux integration.
+        flux_engine: "dense" integrates every mask separately over the full frame, "sparse" packs all
+            masks of a frame (all spots and parts) into one CSR matrix and integrates them at once.
+        lonlat_method: Helioprojective -> heliographic transform, see `SolarCoordinates`. Either way,
+            longitudes and latitudes are only evaluated in the window around the contours of the frame.
+        stat_names: Statistics to compute (see `STAT_REGISTRY`), None for all. Their dependencies are
+            added and only the intermediates (masks, µ, lon/lat, ...) they need are computed.
+        only: If given, only these (sid, t) pairs are computed (lifetimes still count all frames).
+        progress: Whether to show a progress bar over the frames.
 
     Returns:
         Nested dictionary: {sid: {"penumbra": {t: {...}}, "umbra": {...}, "ratio": {...}, "overall": {...}}}
     """
 
+    if flux_engine not in ("dense", "sparse"):
+        raise ValueError(f"Unknown flux engine '{flux_engine}'. Available options are 'dense' and 'sparse'.")
+
+    plan = plan_stats(stat_names)
+    geometry_stats = tuple(stat for stat in plan.stats if stat in GEOMETRY_STATS)
+
     stats: Stats = {}
+    spot_frames: dict = {}
+    lifetimes: dict = {}
 
-    for sid, group in tqdm(sunspots.items()):
+    only_frames: dict = {}
+    for sid, t in only or ():
+        only_frames.setdefault(sid, set()).add(t)
+
+    for sid, group in sunspots.items():
         stats[sid] = {"penumbra": {}, "umbra": {}, "ratio": {}, "overall": {}}
 
         # frames where either inner or outer exists
-        frames = sorted(set(group.get("outer", {}).keys()) | set(group.get("inner", {}).keys()))
+        spot_frames[sid] = set(group.get("outer", {}).keys()) | set(group.get("inner", {}).keys())
+        if only is not None:
+            spot_frames[sid] &= only_frames.get(sid, set())
 
         # Precompute lifetime (frames count) for fields
-        penumbra_lifetime = len(set(group.get("outer", {}).keys()))
-        umbra_lifetime = len(set(group.get("inner", {}).keys()))
+        lifetimes[sid] = {
+            "umbra_lifetime": len(set(group.get("inner", {}).keys())),
+            "penumbra_lifetime": len(set(group.get("outer", {}).keys())),
+        }
+
+    # Frame-major loop: maps that depend only on the frame are computed once for all spots
+    frames = sorted(set().union(*spot_frames.values()))
+
+    for t in tqdm(frames, disable=not progress):
+        image, header = images[t], headers[t]
+        shape = image.shape
+
+        mu2D = compute_mu(header) if plan.needs("mu") else None
+
+        if plan.needs("lonlat"):
+            # lon/lat are only sampled at the contours; skip the transform for the rest of the frame
+            coordinates = SolarCoordinates(header, method=lonlat_method)
+            frame_window = coordinates.contours_window([
+                contour
+                for sid, group in sunspots.items() if t in spot_frames[sid]
+                for part in ("outer", "inner")
+                for contour in group.get(part, {}).get(t, []) or []
+            ])
+            lon2D, lat2D = coordinates.lonlat_maps(window=frame_window)
+        else:
+            lon2D = lat2D = None
+        rsun = header["RSUN_OBS"] / header["CDELT1"]
 
-        lifetime_stats = {
-                "umbra_lifetime": umbra_lifetime,
-                "penumbra_lifetime": penumbra_lifetime,
-            }
+        # (sid, part) -> contours; border flux is appended after the area flux
+        frame_contours = {}
+        mask_matrix_builder = MaskMatrixBuilder(shape=shape) if flux_engine == "sparse" and "flux" in plan else None
 
-        for t in frames:
-            image, header = images[t], headers[t]
-            shape = image.shape
+        for sid, group in sunspots.items():
+            if t not in spot_frames[sid]:
+                continue
 
             outer_contours = group.get("outer", {}).get(t, []) or []
             inner_contours = group.get("inner", {}).get(t, []) or []
 
-            mu2D = compute_mu(header)
-            lon2D, lat2D = pixel_to_lonlat(header)
-            rsun = header["RSUN_OBS"] / header["CDELT1"]
-
             # --- Masks ---
             umbra_masks, umbra_masks_border = compute_masks(
                 contours=inner_contours,
                 shape=shape,
                 mask_holes=None,
-                dtype=np.float32
+                dtype=np.float32,
+                filling=plan.needs("masks"),
+                border=plan.needs("border_masks")
             )
 
             penumbra_masks, penumbra_masks_border = compute_masks(
                 contours=outer_contours,
                 shape=shape,
-                mask_holes=overall_mask(umbra_masks, shape=shape, dtype=np.float32),
-                dtype=np.float32
+                mask_holes=overall_mask(umbra_masks, shape=shape, dtype=np.float32) if plan.needs("masks") else None,
+                dtype=np.float32,
+                filling=plan.needs("masks"),
+                border=plan.needs("border_masks")
             )
 
-            spot_mask = overall_mask(umbra_masks + penumbra_masks, shape=shape)
-
             # --- Geometric stats ---
             umbra_stats = compute_geometry_stats(
                 contours=inner_contours,
@@ -102,7 +152,8 @@ def compute_sunspot_statistics_evolution(
                 mu2d=mu2D,
                 lon2d=lon2D,
                 lat2d=lat2D,
-                rsun=rsun
+                rsun=rsun,
+                include=geometry_stats
             )
 
             penumbra_stats = compute_geometry_stats(
@@ -113,90 +164,130 @@ def compute_sunspot_statistics_evolution(
                 mu2d=mu2D,
                 lon2d=lon2D,
                 lat2d=lat2D,
-                rsun=rsun
-            )
-
-            # --- Flux stats ---
-            umbra_stats.update(compute_flux_area_stats(
-                image=image,
-                masks=umbra_masks,
-                shape=shape,
-                mu2d=mu2D,
-                take_abs=take_abs)
-            )
-            umbra_stats.update(compute_flux_length_stats(
-                image=image,
-                contours=inner_contours,
-                lon2d=lon2D,
-                lat2d=lat2D,
                 rsun=rsun,
-                mu2d=mu2D,
-                min_step=min_step,
-                take_abs=take_abs)
+                include=geometry_stats
             )
 
-            penumbra_stats.update(compute_flux_area_stats(
-                image=image,
-                masks=penumbra_masks,
-                shape=shape,
-                mu2d=mu2D,
-                take_abs=take_abs)
-            )
-            penumbra_stats.update(compute_flux_length_stats(
-                image=image,
-                contours=outer_contours,
-                lon2d=lon2D,
-                lat2d=lat2D,
-                rsun=rsun,
-                mu2d=mu2D,
-                min_step=min_step,
-                take_abs=take_abs)
-            )
+            # --- Area flux stats ---
+            if mask_matrix_builder is not None:
+                mask_matrix_builder.add((sid, "umbra"), umbra_masks)
+                mask_matrix_builder.add((sid, "penumbra"), penumbra_masks)
+            elif "flux" in plan:
+                umbra_stats.update(compute_flux_area_stats(
+                    image=image,
+                    masks=umbra_masks,
+                    shape=shape,
+                    mu2d=mu2D,
+                    take_abs=take_abs)
+                )
+                penumbra_stats.update(compute_flux_area_stats(
+                    image=image,
+                    masks=penumbra_masks,
+                    shape=shape,
+                    mu2d=mu2D,
+                    take_abs=take_abs)
+                )
+
+            frame_contours[(sid, "umbra")] = inner_contours
+            frame_contours[(sid, "penumbra")] = outer_contours
 
             stats[sid]["penumbra"][t] = penumbra_stats
             stats[sid]["umbra"][t] = umbra_stats
-            stats[sid]["ratio"][t] = compute_ratio_stats(
-                umbra_stats=umbra_stats,
-                penumbra_stats=penumbra_stats
-            )
-            stats[sid]["overall"][t] = (
-                    compute_mu_stats(
-                        mask=spot_mask,
-                        mu2d=mu2D,
-                        contour=outer_contours[0] if not is_empty(outer_contours) else None
-                    )
-                    | lifetime_stats
-                    | compute_corrected_total_area(spot_mask=spot_mask, mu2d=mu2D)
+
+            if "ratio" in plan:
+                stats[sid]["ratio"][t] = compute_ratio_stats(
+                    umbra_stats=umbra_stats,
+                    penumbra_stats=penumbra_stats
+                )
+
+            if plan.at_level("overall"):
+                stats[sid]["overall"][t] = compute_overall_stats(
+                    plan=plan,
+                    lifetime_stats=lifetimes[sid],
+                    umbra_masks=umbra_masks,
+                    penumbra_masks=penumbra_masks,
+                    outer_contours=outer_contours,
+                    shape=shape,
+                    mu2d=mu2D
+                )
+
+        # --- Flux stats (all spots of the frame) ---
+        if mask_matrix_builder is not None:
+            area_flux_stats = compute_mask_matrix_flux_stats(
+                mask_matrix=mask_matrix_builder.build(),
+                image=image,
+                mu2d=mu2D,
+                take_abs=take_abs
             )
+            for (sid, part), part_stats in area_flux_stats.items():
+                stats[sid][part][t].update(part_stats)
 
-            # --- µ statistics ---
-            spots_mask = overall_mask(umbra_masks, shape=shape) + overall_mask(penumbra_masks, shape=shape)
-            spots_mask_bin = spots_mask > 0.5
-            empty_entry = not spots_mask.any()
-
-            # centroid µ
-            if not is_empty(outer_contours):
-                centroid_coords = np.array(contour_to_shape(outer_contours[0]).centroid.coords[0]).reshape(-1, 2)
-                mu_centroid = float(sample_map_at_contour(centroid_coords, mu2D, interp=True)[0])
-            else:
-                mu_centroid = np.nan
-
-            mu_mean = safe_call(nanaverage, empty_entry, mu2D, weights=spots_mask)
-
-            if spots_mask_bin.any():
-                mu_min = float(np.nanmin(mu2D[spots_mask_bin]))
-                mu_max = float(np.nanmax(mu2D[spots_mask_bin]))
-            else:
-                mu_min = mu_max = np.nan
-
-            stats[sid]["overall"][t] = {
-                "umbra_lifetime": umbra_lifetime,
-                "penumbra_lifetime": penumbra_lifetime,
-                "corrected_total_area": safe_call(np.nansum, empty_entry, corr_mask(spots_mask, mu2d=mu2D)),
-                "mu_centroid": mu_centroid,
-                "mu_min": mu_min,
-                "mu_max": mu_max,
-                "mu_mean": mu_mean,
-            }
+        if "border_flux" in plan:
+            for (sid, part), contours in frame_contours.items():
+                stats[sid][part][t].update(compute_flux_length_stats(
+                    image=image,
+                    contours=contours,
+                    lon2d=lon2D,
+                    lat2d=lat2D,
+                    rsun=rsun,
+                    mu2d=mu2D,
+                    min_step=min_step,
+                    take_abs=take_abs)
+                )
 
     return stats
+
+
+def compute_overall_stats(
+        plan: StatPlan,
+        lifetime_stats: dict[str, int],
+        umbra_masks: Masks,
+        penumbra_masks: Masks,
+        outer_contours: Contours,
+        shape: tuple[int, int],
+        mu2d: np.ndarray | None
+) -> Stat:
+    """Spot-level statistics of one frame (lifetimes, corrected total area and µ), as far as planned."""
+    overall = {}
+
+    if "lifetime" in plan:
+        overall |= {
+            "umbra_lifetime": lifetime_stats["umbra_lifetime"],
+            "penumbra_lifetime": lifetime_stats["penumbra_lifetime"],
+        }
+
+    if "corrected_total_area" not in plan and "mu" not in plan:
+        return overall
+
+    spots_mask = overall_mask(umbra_masks, shape=shape) + overall_mask(penumbra_masks, shape=shape)
+    empty_entry = not spots_mask.any()
+
+    if "corrected_total_area" in plan:
+        overall["corrected_total_area"] = safe_call(np.nansum, empty_entry, corr_mask(spots_mask, mu2d=mu2d))
+
+    if "mu" in plan:
+        spots_mask_bin = spots_mask > 0.5
+
+        # centroid µ
+        if not is_empty(outer_contours):
+            centroid_coords = np.array(contour_to_shape(outer_contours[0]).centroid.coords[0]).reshape(-1, 2)
+            mu_centroid = float(sample_map_at_contour(centroid_coords, mu2d, interp=True)[0])
+        else:
+            mu_centroid = np.nan
+
+        mu_mean = safe_call(nanaverage, empty_entry, mu2d, weights=spots_mask)
+
+        if spots_mask_bin.any():
+            mu_min = float(np.nanmin(mu2d[spots_mask_bin]))
+            mu_max = float(np.nanmax(mu2d[spots_mask_bin]))
+        else:
+            mu_min = mu_max = np.nan
+
+        overall |= {
+            "mu_centroid": mu_centroid,
+            "mu_min": mu_min,
+            "mu_max": mu_max,
+            "mu_mean": mu_mean,
+        }
+
+    return overall
@@ -1,14 +1,13 @@
 import numpy as np
 
-from scr.utils.types_alias import Contour, Contours, Masks, Mask, Stat
+from scr.utils.types_alias import Contours, Masks, Mask, Stat
 from scr.utils.filesystem import is_empty
 
 from scr.geometry.contours.normalization import normalize_contour_input
-from scr.geometry.contours.sampling import sample_map_at_contour, calc_arc_lengths
-from scr.geometry.contours.densify import densify_contour
+from scr.geometry.contours.sampling import sample_maps_at_contours, calc_arc_lengths_from_lonlat
 
-from scr.stats.computation.masks import overall_mask, corr_mask
-from scr.stats.computation.utils import safe_call, nanaverage, weighted_std, safe_sum
+from scr.stats.computation.masks import overall_mask_support, corr_mask
+from scr.stats.computation.moments import WeightedMoments, merge_moments
 
 
 def compute_flux_area_stats(
@@ -39,25 +38,40 @@ def compute_flux_area_stats(
     dict
         Flux statistics: total, mean, std, corrected_total, corrected_mean, corrected_std,
         plus per-mask lists.
+
+    Notes
+    -----
+    Each mask is reduced once into `WeightedMoments`; the global statistics are
+    merged from these partials. Pixels where masks overlap would be counted more
+    than once and holes would subtract weight, so the summed weight outside [0, 1] is
+    removed explicitly to match `overall_mask`.
     """
 
-    def _process_mask(mask: Mask) -> tuple[float, float, float, float, float, float]:
-        empty_entry = not np.any(mask)
+    def _process_mask(mask: Mask) -> tuple[WeightedMoments, WeightedMoments]:
+        moments = WeightedMoments.from_samples(values, weights=mask)
+
+        if mu2d is None:
+            corr_moments = WeightedMoments()
+        else:
+            corr_moments = WeightedMoments.from_samples(values, weights=corr_mask(mask, mu2d=mu2d))
+
+        return moments, corr_moments
 
-        # uncorrected
-        total = safe_call(safe_sum, empty_entry, values * mask)
-        mean = safe_call(nanaverage, empty_entry, values, weights=mask)
-        std = safe_call(weighted_std, empty_entry, values, mean, weights=mask)
+    def _stats(
+            moments: WeightedMoments,
+            corr_moments: WeightedMoments,
+            empty_entry: bool
+    ) -> tuple[float, float, float, float, float, float]:
+        if empty_entry:
+            return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
+
+        total, mean, std = moments.as_tuple()
 
         # corrected
         if mu2d is None:
             corr_total = corr_mean = corr_std = np.nan
         else:
-            corr_weights = corr_mask(mask, mu2d=mu2d)
-
-            corr_total = safe_call(safe_sum, empty_entry, values * corr_weights)
-            corr_mean = safe_call(nanaverage, empty_entry, values, weights=corr_weights)
-            corr_std = safe_call(weighted_std, empty_entry, values, corr_mean, weights=corr_weights)
+            corr_total, corr_mean, corr_std = corr_moments.as_tuple()
 
         return total, mean, std, corr_total, corr_mean, corr_std
 
@@ -70,10 +84,15 @@ def compute_flux_area_stats(
     # ---- Containers for per-mask values ----
     totals, means, stds = [], [], []
     corr_totals, corr_means, corr_stds = [], [], []
+    partials, corr_partials = [], []
 
-    # ---- Process each mask individually ----
+    # ---- Process each mask individually (one pass per mask) ----
     for mask in masks:
-        t, m, s, ct, cm, cs = _process_mask(mask)
+        moments, corr_moments = _process_mask(mask)
+        partials.append(moments)
+        corr_partials.append(corr_moments)
+
+        t, m, s, ct, cm, cs = _stats(moments, corr_moments, empty_entry=not np.any(mask))
         totals.append(t)
         means.append(m)
         stds.append(s)
@@ -81,11 +100,24 @@ def compute_flux_area_stats(
         corr_means.append(cm)
         corr_stds.append(cs)
 
-    # global stats
-    mask = overall_mask(masks, shape=shape)
-
-    global_total, global_mean, global_std, global_corr_total, global_corr_mean, global_corr_std = _process_mask(
-        mask
+    # global stats: merge the per-mask partials; the summed weight is clipped to [0, 1] (see `overall_mask`)
+    global_moments, global_corr_moments = merge_moments(partials), merge_moments(corr_partials)
+
+    # only the pixels where the summed masks fall outside [0, 1] are read again
+    support_idx, summed, clipped = overall_mask_support(masks)
+    excess = summed - clipped
+    excess_idx = np.flatnonzero(excess)
+    if len(excess_idx):
+        excess, excess_idx = excess[excess_idx], support_idx[excess_idx]
+        excess_values = np.ravel(values)[excess_idx]
+        global_moments = global_moments.with_excess_removed(excess_values, excess)
+        if mu2d is not None:
+            global_corr_moments = global_corr_moments.with_excess_removed(
+                excess_values, corr_mask(excess, mu2d=np.ravel(mu2d)[excess_idx])
+            )
+
+    global_total, global_mean, global_std, global_corr_total, global_corr_mean, global_corr_std = _stats(
+        global_moments, global_corr_moments, empty_entry=not np.any(clipped.astype(np.float32))
     )
 
     out = {
@@ -142,42 +174,46 @@ def compute_flux_length_stats(
     dict
         Flux statistics: total, mean, std, corrected_total, corrected_mean, corrected_std,
         plus per-mask lists.
+
+    Notes
+    -----
+    The image, lon/lat and mu maps are sampled at all densified contours with a
+    single `sample_maps_at_contours` call. The arc-length weighted samples of each
+    contour are reduced once into `WeightedMoments`; the global statistics are
+    the merged partials.
     """
 
-    def _process_contour(contour: Contour | Contours) -> tuple[float, float, float, float, float, float]:
-        # Determine if we have a list of contours (Contours)
-        if isinstance(contour, list):
-            contour_list = [c for c in contour if not is_empty(c)]
-        else:
-            contour_list = [contour] if not is_empty(contour) else []
+    def _process_contour(samples: np.ndarray) -> tuple[WeightedMoments, WeightedMoments] | None:
+        if is_empty(samples[0]):
+            return None
 
-        # Check empty entry
-        empty_entry = (len(contour_list) == 0)
+        values_on_contour, lon, lat = samples[0], samples[1], samples[2]
+        arc_lengths = calc_arc_lengths_from_lonlat(contour_lon=lon, contour_lat=lat, rsun=rsun)
 
-        if empty_entry:
-            return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan  # solve np.concatenate of []
+        moments = WeightedMoments.from_samples(values_on_contour, weights=arc_lengths)
+
+        if mu2d is None:
+            corr_moments = WeightedMoments()
+        else:
+            weights = 1. / samples[3]
+            corr_moments = WeightedMoments.from_samples(values_on_contour, weights=weights * arc_lengths)
+
+        return moments, corr_moments
 
-        values_on_contour = np.concatenate([sample_map_at_contour(contour=c, data_map=values, interp=True)
-                                            for c in contour_list])
-        arc_lengths = np.concatenate(
-            [calc_arc_lengths(c, lon2d=lon2d, lat2d=lat2d, rsun=rsun) for c in contour_list])
+    def _stats(
+            partial: tuple[WeightedMoments, WeightedMoments] | None
+    ) -> tuple[float, float, float, float, float, float]:
+        if partial is None:
+            return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
 
-        # uncorrected
-        total = safe_call(safe_sum, empty_entry, values_on_contour * arc_lengths)
-        mean = safe_call(nanaverage, empty_entry, values_on_contour, weights=arc_lengths)
-        std = safe_call(weighted_std, empty_entry, values_on_contour, mean, weights=arc_lengths)
+        moments, corr_moments = partial
+        total, mean, std = moments.as_tuple()
 
         # corrected
         if mu2d is None:
             corr_total = corr_mean = corr_std = np.nan
         else:
-            weights = np.concatenate([1. / sample_map_at_contour(contour=c, data_map=mu2d, interp=True)
-                                      for c in contour_list])
-
-            corr_total = safe_call(safe_sum, empty_entry, values_on_contour * weights * arc_lengths)
-            corr_mean = safe_call(nanaverage, empty_entry, values_on_contour, weights=weights * arc_lengths)
-            corr_std = safe_call(weighted_std, empty_entry, values_on_contour, corr_mean,
-                                  weights=weights * arc_lengths)
+            corr_total, corr_mean, corr_std = corr_moments.as_tuple()
 
         return total, mean, std, corr_total, corr_mean, corr_std
 
@@ -186,21 +222,22 @@ def compute_flux_length_stats(
     # ---- Ensure contour list format ----
     contours = normalize_contour_input(contours)
 
-    # ---- Densify each contour ONCE ----
-    dense_contours = []
-    for c in contours:
-        if is_empty(c):
-            dense_contours.append(c)  # keep empty
-        else:
-            dense_contours.append(densify_contour(c, min_step=min_step))
+    # ---- Densify each contour ONCE and sample all maps at all contours in one call ----
+    data_maps = [values, lon2d, lat2d] if mu2d is None else [values, lon2d, lat2d, mu2d]
+    contour_samples = sample_maps_at_contours(contours, data_maps=data_maps, interp=True, min_step=min_step)
 
     # ---- Containers for per-mask values ----
     totals, means, stds = [], [], []
     corr_totals, corr_means, corr_stds = [], [], []
+    partials = []
+
+    # ---- Process each contour individually (one pass per contour) ----
+    for samples in contour_samples:
+        partial = _process_contour(samples)
+        if partial is not None:
+            partials.append(partial)
 
-    # ---- Process each mask individually ----
-    for contour in dense_contours:
-        t, m, s, ct, cm, cs = _process_contour(contour)
+        t, m, s, ct, cm, cs = _stats(partial)
         totals.append(t)
         means.append(m)
         stds.append(s)
@@ -208,9 +245,17 @@ def compute_flux_length_stats(
         corr_means.append(cm)
         corr_stds.append(cs)
 
-    # global stats
-    global_total, global_mean, global_std, global_corr_total, global_corr_mean, global_corr_std = _process_contour(
-        contour=dense_contours
+    # global stats: border segments are disjoint sample sets, so the partials simply add up
+    if partials:
+        global_partial = (
+            merge_moments(p[0] for p in partials),
+            merge_moments(p[1] for p in partials),
+        )
+    else:
+        global_partial = None
+
+    global_total, global_mean, global_std, global_corr_total, global_corr_mean, global_corr_std = _stats(
+        global_partial
     )
 
     out = {
@@ -0,0 +1,217 @@
+import hashlib
+import numpy as np
+from os import path
+from typing import Callable, Literal, Sequence
+
+from scr.utils.types_alias import Headers, Stats, Sunspots, SunspotID, FrameID
+
+from scr.io.pickle import load_pickle, save_pickle
+
+from scr.geometry.wcs.prepared import header_content_hash
+
+from scr.stats.computation.evolution import compute_sunspot_statistics_evolution
+from scr.stats.computation.registry import STAT_REGISTRY, plan_stats
+
+
+# bump when the computation of stored statistics changes to invalidate old entries
+STORE_VERSION = 1
+
+LEVELS = ("penumbra", "umbra", "ratio", "overall")
+
+
+class StatsStore:
+    """
+    Sidecar store of per-(spot, frame) statistics keyed by content hashes (see `spot_frame_key`).
+
+    Values are {level: stat dict} for the levels the keyed statistics are stored in.
+    """
+
+    def __init__(
+            self,
+            filename: str | None = None,
+            entries: dict[str, dict] | None = None
+    ):
+        self.filename = filename
+        self.entries = entries or {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, filename: str) -> "StatsStore":
+        """Load the store from filename; empty if the file does not exist yet."""
+        entries = load_pickle(filename) if path.isfile(filename) else {}
+        return cls(filename=filename, entries=entries)
+
+    def save(self, filename: str | None = None) -> None:
+        filename = filename or self.filename
+        if filename is None:
+            raise ValueError("No filename given for the stats store.")
+        save_pickle(filename, self.entries)
+
+    def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        self.entries[key] = entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"StatsStore({len(self)} entries, {self.hits} hits, {self.misses} misses)"
+
+
+def stats_store_path(
+        contour_file: str
+) -> str:
+    """Sidecar store of a contour file."""
+    return contour_file.replace(".npz", "_stats_store.pkl")
+
+
+def spot_frame_key(
+        group: dict,
+        t: FrameID,
+        header_hash: str,
+        lifetimes: tuple[int, int],
+        config: dict
+) -> str:
+    """
+    Content hash of everything the statistics of one spot in one frame depend on:
+    the inner and outer contour vertices, the frame header, the spot lifetimes and the
+    statistics configuration (statistic names, parameters, quantity and frame source).
+    """
+    sha = hashlib.sha1()
+    sha.update(repr((STORE_VERSION, header_hash, lifetimes, sorted(config.items()))).encode())
+
+    for part in ("inner", "outer"):
+        contours = group.get(part, {}).get(t, []) or []
+        sha.update(f"{part}:{len(contours)}".encode())
+        for contour in contours:
+            contour = np.ascontiguousarray(contour, dtype=np.float64)
+            sha.update(repr(contour.shape).encode())
+            sha.update(contour.tobytes())
+
+    return sha.hexdigest()
+
+
+def compute_sunspot_statistics_incremental(
+        sunspots: Sunspots,
+        images: Sequence[np.ndarray] | Callable[[], Sequence[np.ndarray]],
+        headers: Headers,
+        store: StatsStore,
+        quantity: str,
+        frame_ids: Sequence[str] | None = None,
+        min_step: float = 0.5,
+        take_abs: bool = False,
+        flux_engine: Literal["dense", "sparse"] = "dense",
+        lonlat_method: Literal["astropy", "numpy"] = "astropy",
+        stat_names: Sequence[str] | None = None
+) -> Stats:
+    """
+    `compute_sunspot_statistics_evolution` that reuses the results stored in `store` and
+    computes (and stores) only the missing or changed (spot, frame) entries.
+
+    Statistics that do not read the image (geometry, ratios, µ, lifetimes) are keyed without the
+    quantity, so they are shared by all quantities; adding a quantity only computes its flux statistics.
+
+    Parameters:
+        images: The frames of the quantity, or a callable loading them (called only if something is missing).
+        store: Sidecar store, updated in place (saving is left to the caller).
+        quantity: Name of the quantity of the images.
+        frame_ids: Identifiers of the frame sources (e.g. FITS file names), part of the keys if given.
+        Other parameters as in `compute_sunspot_statistics_evolution`.
+
+    Returns:
+        Same as `compute_sunspot_statistics_evolution`.
+    """
+    plan = plan_stats(stat_names)
+
+    # quantity-independent statistics first, as in the output of the evolution
+    groups = [
+        [stat for stat in plan.stats if "image" not in STAT_REGISTRY[stat].inputs],
+        [stat for stat in plan.stats if "image" in STAT_REGISTRY[stat].inputs],
+    ]
+
+    lifetimes = {
+        sid: (len(group.get("inner", {})), len(group.get("outer", {})))
+        for sid, group in sunspots.items()
+    }
+    spot_frames = {
+        sid: sorted(set(group.get("outer", {}).keys()) | set(group.get("inner", {}).keys()))
+        for sid, group in sunspots.items()
+    }
+    header_hashes = {}
+
+    results: list[dict[tuple[SunspotID, FrameID], dict]] = []
+    loaded_images = None
+
+    for group_stats in groups:
+        if not group_stats:
+            continue
+
+        per_quantity = "image" in STAT_REGISTRY[group_stats[-1]].inputs
+        config = {
+            "stats": tuple(group_stats),
+            "lonlat_method": lonlat_method,
+        }
+        if per_quantity:
+            config |= {
+                "quantity": quantity,
+                "min_step": min_step,
+                "take_abs": take_abs,
+                "flux_engine": flux_engine,
+            }
+
+        keys, entries, missing = {}, {}, []
+        for sid, frames in spot_frames.items():
+            for t in frames:
+                if t not in header_hashes:
+                    header_hashes[t] = header_content_hash(headers[t])
+
+                frame_config = config | {"frame_id": frame_ids[t]} if per_quantity and frame_ids else config
+                keys[(sid, t)] = spot_frame_key(sunspots[sid], t, header_hashes[t], lifetimes[sid], frame_config)
+
+                entry = store.get(keys[(sid, t)])
+                if entry is None:
+                    missing.append((sid, t))
+                else:
+                    entries[(sid, t)] = entry
+
+        if missing:
+            if loaded_images is None:
+                loaded_images = images() if callable(images) else images
+
+            computed = compute_sunspot_statistics_evolution(
+                sunspots=sunspots,
+                images=loaded_images,
+                headers=headers,
+                min_step=min_step,
+                take_abs=take_abs,
+                flux_engine=flux_engine,
+                lonlat_method=lonlat_method,
+                stat_names=group_stats,
+                only=missing
+            )
+
+            for sid, t in missing:
+                entry = {level: computed[sid][level][t] for level in LEVELS if t in computed[sid][level]}
+                store.put(keys[(sid, t)], entry)
+                entries[(sid, t)] = entry
+
+        results.append(entries)
+
+    # assemble in the order of the evolution output
+    stats: Stats = {}
+    for sid, frames in spot_frames.items():
+        stats[sid] = {level: {} for level in LEVELS}
+        for t in frames:
+            for entries in results:
+                for level, stat in entries[(sid, t)].items():
+                    stats[sid][level].setdefault(t, {}).update(stat)
+
+    return stats
@@ -17,6 +17,25 @@ def overall_mask(
         return np.zeros(shape=shape, dtype=dtype)
 
 
+def overall_mask_support(
+        masks: Masks
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `overall_mask` restricted to the union of the masks' non-zero supports, as
+    (flat pixel indices, summed weights, clipped weights), so disjoint masks cost no dense pass.
+    """
+    flat_masks = [np.asarray(mask).ravel() for mask in masks]
+    supports = [np.flatnonzero(mask) for mask in flat_masks]
+    if not any(len(support) for support in supports):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+
+    weights = np.concatenate([mask[support] for mask, support in zip(flat_masks, supports)]).astype(np.float64)
+    idx, inverse = np.unique(np.concatenate(supports), return_inverse=True)
+    summed = np.bincount(inverse, weights=np.where(np.isnan(weights), 0., weights), minlength=len(idx))
+
+    return idx, summed, np.clip(summed, 0.0, 1.0)
+
+
 def corr_mask(
         mask: Mask,
         mu2d: np.ndarray
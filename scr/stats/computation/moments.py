@@ -0,0 +1,102 @@
+import numpy as np
+from dataclasses import dataclass, replace
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class WeightedMoments:
+    """
+    Mergeable weighted moments (Σw, Σwx, M2 = Σw(x - mean)²) of the finite samples of a quantity.
+
+    Partial moments of disjoint (or explicitly corrected, see `with_excess_removed`)
+    sample sets combine with the pairwise update of Chan et al., so global statistics follow
+    from per-mask or per-contour partials without another pass over the pixels. The second
+    moment is kept centred on the mean, which avoids the cancellation of Σwx² / Σw - mean².
+    """
+    sum_w: float = 0.
+    sum_wx: float = 0.
+    m2: float = 0.
+    n_finite: int = 0
+
+    @classmethod
+    def from_samples(
+            cls,
+            values: np.ndarray,
+            weights: np.ndarray
+    ) -> "WeightedMoments":
+        """Accumulate samples where both the value and the weight are finite."""
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        finite = np.isfinite(values) & np.isfinite(weights)
+        x, w = values[finite], weights[finite]
+
+        sum_w = float(np.sum(w))
+        sum_wx = float(np.sum(w * x))
+        mean = sum_wx / sum_w if sum_w != 0. else 0.
+
+        return cls(
+            sum_w=sum_w,
+            sum_wx=sum_wx,
+            m2=float(np.sum(w * (x - mean) ** 2)),
+            n_finite=int(np.count_nonzero(finite)),
+        )
+
+    def __add__(self, other: "WeightedMoments") -> "WeightedMoments":
+        sum_w = self.sum_w + other.sum_w
+        m2 = self.m2 + other.m2
+
+        if self.sum_w != 0. and other.sum_w != 0. and sum_w != 0.:
+            delta = other.sum_wx / other.sum_w - self.sum_wx / self.sum_w
+            m2 += delta ** 2 * self.sum_w * other.sum_w / sum_w
+
+        return WeightedMoments(
+            sum_w=sum_w,
+            sum_wx=self.sum_wx + other.sum_wx,
+            m2=m2,
+            n_finite=self.n_finite + other.n_finite,
+        )
+
+    def with_excess_removed(
+            self,
+            values: np.ndarray,
+            excess_weights: np.ndarray
+    ) -> "WeightedMoments":
+        """
+        Remove weights counted more than once when merging partials of overlapping
+        masks (e.g. the part of a summed mask that `overall_mask` clips at 1).
+        """
+        excess = WeightedMoments.from_samples(values, excess_weights)
+        # merging negated moments removes the surplus weight; samples are not removed
+        removed = self + WeightedMoments(sum_w=-excess.sum_w, sum_wx=-excess.sum_wx, m2=-excess.m2)
+        return replace(removed, n_finite=self.n_finite)
+
+    @property
+    def total(self) -> float:
+        """Weighted sum; NaN if no finite sample was seen (like `safe_sum`)."""
+        return float(self.sum_wx) if self.n_finite > 0 else np.nan
+
+    @property
+    def mean(self) -> float:
+        """Weighted mean; NaN for zero total weight (like `nanaverage`)."""
+        return float(self.sum_wx / self.sum_w) if self.sum_w != 0. else np.nan
+
+    @property
+    def std(self) -> float:
+        """Weighted (population) standard deviation (like `weighted_std`)."""
+        mean = self.mean
+        if not np.isfinite(mean):
+            return np.nan
+
+        return float(np.sqrt(max(self.m2 / self.sum_w, 0.)))
+
+    def as_tuple(self) -> tuple[float, float, float]:
+        return self.total, self.mean, self.std
+
+
+def merge_moments(moments: Iterable[WeightedMoments]) -> WeightedMoments:
+    """Sum partial moments."""
+    merged = WeightedMoments()
+    for m in moments:
+        merged = merged + m
+    return merged
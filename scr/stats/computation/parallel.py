@@ -0,0 +1,168 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from tempfile import TemporaryDirectory
+from tqdm import tqdm
+from typing import Literal, Sequence
+
+from scr.utils.types_alias import Headers, Stats, Sunspots
+
+from scr.stats.computation.evolution import compute_sunspot_statistics_evolution
+
+
+# set in each worker by `_init_worker`
+_worker_state: dict = {}
+
+
+def available_memory_gb() -> float | None:
+    """Available physical memory in GB, None if the platform does not report it."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024. ** 3
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def resolve_worker_count(
+        n_workers: int | None = None,
+        memory_per_worker_gb: float | None = None
+) -> int:
+    """
+    Number of workers: n_workers (all CPUs if None or <= 0), capped so that the workers
+    fit into the available memory if memory_per_worker_gb is given.
+    """
+    if n_workers is None or n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+
+    if memory_per_worker_gb is not None and memory_per_worker_gb > 0.:
+        memory_gb = available_memory_gb()
+        if memory_gb is not None:
+            n_workers = min(n_workers, int(memory_gb // memory_per_worker_gb))
+
+    return max(n_workers, 1)
+
+
+def _memmap_images(
+        images: Sequence[np.ndarray],
+        frames: Sequence[int],
+        directory: str
+) -> dict[int, str]:
+    # one .npy per frame (the frames may differ in shape); workers open them read-only and memory-mapped
+    filenames = {}
+    for t in frames:
+        filenames[t] = path.join(directory, f"frame_{t}.npy")
+        np.save(filenames[t], np.asarray(images[t]))
+    return filenames
+
+
+class _MemmapFrames:
+    """Lazily memory-mapped frames indexed like the original image sequence."""
+
+    def __init__(self, filenames: dict[int, str]):
+        self.filenames = filenames
+
+    def __getitem__(self, t: int) -> np.ndarray:
+        return np.load(self.filenames[t], mmap_mode="r")
+
+
+def _init_worker(
+        sunspots: Sunspots,
+        image_files: dict[int, str],
+        headers: Headers,
+        kwargs: dict
+) -> None:
+    _worker_state["sunspots"] = sunspots
+    _worker_state["images"] = _MemmapFrames(image_files)
+    _worker_state["headers"] = headers
+    _worker_state["kwargs"] = kwargs
+
+
+def _compute_chunk(
+        only: list[tuple]
+) -> Stats:
+    return compute_sunspot_statistics_evolution(
+        sunspots=_worker_state["sunspots"],
+        images=_worker_state["images"],
+        headers=_worker_state["headers"],
+        only=only,
+        progress=False,
+        **_worker_state["kwargs"]
+    )
+
+
+def compute_sunspot_statistics_parallel(
+        sunspots: Sunspots,
+        images: Sequence[np.ndarray],
+        headers: Headers,
+        min_step: float = 0.5,
+        take_abs: bool = False,
+        flux_engine: Literal["dense", "sparse"] = "dense",
+        lonlat_method: Literal["astropy", "numpy"] = "astropy",
+        stat_names: Sequence[str] | None = None,
+        n_workers: int | None = None,
+        chunk_size: int = 8,
+        memory_per_worker_gb: float | None = None,
+        cache_dir: str | None = None
+) -> Stats:
+    """
+    `compute_sunspot_statistics_evolution` on a process pool.
+
+    The work is split into chunks of consecutive frames (all spots of a frame in the same chunk), so each
+    worker computes the µ and lon/lat maps of a frame once. The frames are written once to memory-mapped
+    .npy files that the workers read from, and the chunk results are merged in frame order, so the output
+    is identical to the serial one (including the key order).
+
+    Parameters:
+        n_workers: Number of worker processes; all CPUs if None or <= 0. With 1, runs serially in-process.
+        chunk_size: Number of frames per work unit.
+        memory_per_worker_gb: Expected peak memory of a worker; if given, the number of workers is
+            capped to fit into the available memory.
+        cache_dir: Directory for the memory-mapped frames (system temporary directory if None).
+        Other parameters as in `compute_sunspot_statistics_evolution`.
+
+    Returns:
+        Same as `compute_sunspot_statistics_evolution`.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+
+    kwargs = {
+        "min_step": min_step,
+        "take_abs": take_abs,
+        "flux_engine": flux_engine,
+        "lonlat_method": lonlat_method,
+        "stat_names": stat_names,
+    }
+
+    spot_frames = {
+        sid: set(group.get("outer", {}).keys()) | set(group.get("inner", {}).keys())
+        for sid, group in sunspots.items()
+    }
+    frames = sorted(set().union(*spot_frames.values()))
+    chunks = [
+        [(sid, t) for t in frames[i:i + chunk_size] for sid in sunspots if t in spot_frames[sid]]
+        for i in range(0, len(frames), chunk_size)
+    ]
+
+    n_workers = min(resolve_worker_count(n_workers, memory_per_worker_gb), max(len(chunks), 1))
+    if n_workers == 1:
+        return compute_sunspot_statistics_evolution(sunspots=sunspots, images=images, headers=headers, **kwargs)
+
+    with TemporaryDirectory(dir=cache_dir) as directory:
+        image_files = _memmap_images(images, frames, directory)
+
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(sunspots, image_files, headers, kwargs)
+        ) as executor:
+            # map yields in submission order, i.e. the chunks are merged in frame order
+            chunk_stats = tqdm(executor.map(_compute_chunk, chunks), total=len(chunks))
+
+            stats: Stats = {sid: {"penumbra": {}, "umbra": {}, "ratio": {}, "overall": {}} for sid in sunspots}
+            for chunk in chunk_stats:
+                for sid, levels in chunk.items():
+                    for level, values in levels.items():
+                        stats[sid][level].update(values)
+
+    return stats
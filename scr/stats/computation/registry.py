@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Iterable, Literal
+
+
+# Per-frame intermediates the statistics are computed from
+#   masks:        filling-factor masks of umbra and penumbra (penumbra with the umbra cut out)
+#   border_masks: one-pixel border masks of the contours
+#   mu:           map of cos(theta)
+#   lonlat:       heliographic longitude and latitude of the pixels around the contours
+#   image:        the frame of the processed quantity
+Intermediate = Literal["masks", "border_masks", "mu", "lonlat", "image"]
+
+
+def _with_lists(*keys: str) -> tuple[str, ...]:
+    return keys + tuple(f"{key}_list" for key in keys)
+
+
+@dataclass(frozen=True)
+class StatSpec:
+    """
+    Declaration of a named statistic.
+
+    level: where the outputs are stored, i.e. in stats[sid][level][t] for level "overall" and "ratio",
+        and in stats[sid]["umbra"|"penumbra"][t] for level "part".
+    inputs: per-frame intermediates the statistic is computed from.
+    requires: other statistics whose outputs it reads.
+    outputs: keys of the stored values, in the order they are stored.
+    """
+    name: str
+    level: Literal["part", "ratio", "overall"]
+    inputs: tuple[Intermediate, ...] = ()
+    requires: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+# in computation (and output) order
+STAT_REGISTRY: dict[str, StatSpec] = {spec.name: spec for spec in [
+    StatSpec("area", "part", inputs=("masks", "mu"),
+             outputs=_with_lists("corrected_area", "contour_area", "mask_area")),
+    StatSpec("length", "part", inputs=("border_masks", "lonlat"),
+             outputs=_with_lists("corrected_length", "contour_length", "mask_length")),
+    StatSpec("fractal_dimension", "part", inputs=("border_masks",),
+             outputs=_with_lists("fractal_dimension")),
+    StatSpec("component_count", "part",
+             outputs=("component_count", "hole_count")),
+    StatSpec("flux", "part", inputs=("masks", "mu", "image"),
+             outputs=_with_lists("flux_total", "flux_mean", "flux_std",
+                                 "corrected_flux_total", "corrected_flux_mean", "corrected_flux_std")),
+    StatSpec("border_flux", "part", inputs=("lonlat", "mu", "image"),
+             outputs=_with_lists("border_flux_total", "border_flux_mean", "border_flux_std",
+                                 "corrected_border_flux_total", "corrected_border_flux_mean",
+                                 "corrected_border_flux_std")),
+    StatSpec("ratio", "ratio", requires=("area", "length"),
+             outputs=("area", "length")),
+    StatSpec("lifetime", "overall",
+             outputs=("umbra_lifetime", "penumbra_lifetime")),
+    StatSpec("corrected_total_area", "overall", inputs=("masks", "mu"),
+             outputs=("corrected_total_area",)),
+    StatSpec("mu", "overall", inputs=("masks", "mu"),
+             outputs=("mu_centroid", "mu_min", "mu_max", "mu_mean")),
+]}
+
+
+@dataclass(frozen=True)
+class StatPlan:
+    """Statistics to compute (requested ones and their dependencies) and the intermediates they need."""
+    stats: tuple[str, ...]
+    intermediates: frozenset[str]
+
+    def __contains__(self, stat: str) -> bool:
+        return stat in self.stats
+
+    def needs(self, intermediate: Intermediate) -> bool:
+        return intermediate in self.intermediates
+
+    def at_level(self, level: Literal["part", "ratio", "overall"]) -> tuple[str, ...]:
+        return tuple(stat for stat in self.stats if STAT_REGISTRY[stat].level == level)
+
+
+def plan_stats(
+        requested: Iterable[str] | None = None
+) -> StatPlan:
+    """
+    Resolve the requested statistics (all if None) with their dependencies into a `StatPlan`.
+    """
+    if requested is None:
+        requested = STAT_REGISTRY.keys()
+
+    selected = set()
+    stack = list(requested)
+    while stack:
+        stat = stack.pop()
+        if stat not in STAT_REGISTRY:
+            raise ValueError(f"Unknown statistic '{stat}'. Available options are {list(STAT_REGISTRY)}.")
+        if stat not in selected:
+            selected.add(stat)
+            stack.extend(STAT_REGISTRY[stat].requires)
+
+    stats = tuple(stat for stat in STAT_REGISTRY if stat in selected)
+    intermediates = frozenset(intermediate for stat in stats for intermediate in STAT_REGISTRY[stat].inputs)
+
+    return StatPlan(stats=stats, intermediates=intermediates)
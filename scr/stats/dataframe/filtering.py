@@ -1,239 +1,315 @@
 import numpy as np
 import pandas as pd
-from typing import Literal, Callable
+from dataclasses import dataclass
+from typing import Callable, Collection, Literal
 
-from scr.utils.filesystem import is_empty
 
+GROUP_COLUMNS = ["observation_id", "sunspot_id"]
 
-def filter_combined_df(
-        df: pd.DataFrame,
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """
+    One resolved filter of `filter_combined_df`.
+
+    column: filtered column.
+    mode: "frame-wise" keeps the passing rows; "any" / "all" keep the (observation_id, sunspot_id)
+        groups where any / all of the (remaining) rows pass.
+    min_val, max_val, exact_val, func: the condition; exactly one of a range, an exact value or a callable.
+    """
+    column: str
+    mode: Literal["frame-wise", "any", "all"]
+    min_val: float | None = None
+    max_val: float | None = None
+    exact_val: float | str | None = None
+    func: Callable[[pd.Series], pd.Series] | None = None
+
+
+def _build_column_name(part: str, param: str, stats_key: str | None = None) -> str:
+    if part in {"overall", "ratio"}:
+        return f"{part}_{param}"
+
+    if "flux" in param or "variation" in param:
+        if stats_key is None:
+            raise ValueError(f"'stats_key' required for flux parameter '{param}'")
+        return f"{stats_key}_{part}_{param}"
+
+    return f"{part}_{param}"
+
+
+def plan_filters(
+        columns: Collection[str],
         filtering_kwargs: dict
-) -> pd.DataFrame:
+) -> list[FilterSpec]:
     """
-    Filter a combined sunspot statistics DataFrame using flexible, hierarchical criteria.
+    Resolve filtering_kwargs (direct columns or {part: {param: spec}}) against the available columns
+    into filters in application order.
     """
+    plan = []
+
+    def _add(column: str, spec: dict) -> None:
+        filter_spec = FilterSpec(
+            column=column,
+            mode=spec["mode"],
+            min_val=spec.get("min_value"),
+            max_val=spec.get("max_value"),
+            exact_val=spec.get("exact_value"),
+            func=spec.get("func"),
+        )
 
-    group_cols = ["observation_id", "sunspot_id"]
-    if set(group_cols).issubset(df.columns):
-        # MUST BE PRESENT FOR `MODE IN ["ALL", "ANY"]`, NOT FOR `MODE == "FRAME-WISE"
-        # Precompute group keys ONCE (important for speed & correctness)
-        group_keys = df[group_cols].apply(tuple, axis=1)
+        filter_types = [
+            filter_spec.exact_val is not None,
+            filter_spec.min_val is not None or filter_spec.max_val is not None,
+            filter_spec.func is not None,
+        ]
 
-    # ------------------------------------------------------------------
-    # Helpers
-    # ------------------------------------------------------------------
+        if sum(filter_types) != 1:
+            raise ValueError("Exactly one of exact_value, range, or func must be provided.")
 
-    def _build_column_name(part: str, param: str, stats_key: str | None = None) -> str:
-        if part in {"overall", "ratio"}:
-            return f"{part}_{param}"
+        if filter_spec.mode not in ("frame-wise", "any", "all"):
+            raise ValueError(f"Unknown mode '{filter_spec.mode}'")
 
-        if "flux" in param or "variation" in param:
-            if stats_key is None:
-                raise ValueError(f"'stats_key' required for flux parameter '{param}'")
-            return f"{stats_key}_{part}_{param}"
+        plan.append(filter_spec)
 
-        return f"{part}_{param}"
+    for key, spec in filtering_kwargs.items():
 
-    def _cell_satisfies(
-            value,
-            min_val: float | None = None,
-            max_val: float | None = None,
-            exact_val: float | str | None = None,
-    ) -> bool:
-        """
-        Scalar or array-like test.
-        - Scalars → treated as length-1 arrays
-        - Arrays → ALL elements must satisfy
-        - NaN / empty → False
-        """
-        if value is None:
-            return False
+        # ---- Case 1: direct column
+        if key in columns:
+            _add(key, spec)
+            continue
 
-        if isinstance(value, float) and np.isnan(value):
-            return False
+        # ---- Case 2: structured
+        part = key
+        for param, p_spec in spec.items():
+            col = _build_column_name(
+                part=part,
+                param=param,
+                stats_key=p_spec.get("stats_key", "Ic"),
+            )
 
-        if isinstance(value, (list, tuple, np.ndarray)):
-            arr = np.asarray(value)
-            if is_empty(arr):
-                return False
-        else:
-            arr = np.asarray([value])
+            if col not in columns:
+                raise KeyError(f"Column '{col}' not found in DataFrame")
 
-        if exact_val is not None:
-            return bool(np.all(arr == exact_val))
+            _add(col, p_spec)
 
-        cond = np.ones(arr.shape, dtype=bool)
+    return plan
 
-        if min_val is not None:
-            cond &= arr >= min_val
-        if max_val is not None:
-            cond &= arr <= max_val
 
-        return bool(np.all(cond))
+def _values_satisfy(
+        values: np.ndarray,
+        min_val: float | None = None,
+        max_val: float | None = None,
+        exact_val: float | str | None = None,
+) -> np.ndarray:
+    # element-wise condition on a flat array
+    if exact_val is not None:
+        return np.asarray(values == exact_val, dtype=bool)
 
-    def _scalar_satisfies(
-            arr: np.ndarray,
-            min_val: float | None = None,
-            max_val: float | None = None,
-            exact_val: float | str | None = None,
-    ) -> np.ndarray:
-        """Vectorised scalar-only version."""
-        mask = np.isfinite(arr)
+    cond = np.ones(values.shape, dtype=bool)
+    if min_val is not None:
+        cond &= values >= min_val
+    if max_val is not None:
+        cond &= values <= max_val
 
-        if exact_val is not None:
-            return mask & (arr == exact_val)
+    return cond
 
-        if min_val is not None:
-            mask &= arr >= min_val
-        if max_val is not None:
-            mask &= arr <= max_val
 
-        return mask
+def _cells_satisfy(
+        cells: np.ndarray,
+        min_val: float | None = None,
+        max_val: float | None = None,
+        exact_val: float | str | None = None,
+) -> np.ndarray:
+    """
+    Vectorised test of object cells (scalars or array-likes):
+    - Scalars → treated as length-1 arrays
+    - Arrays → ALL elements must satisfy
+    - None / NaN / empty → False
+    The cells are exploded into one flat array, tested at once and reduced per cell.
+    """
+    arrays = []
+    lengths = np.zeros(len(cells), dtype=np.int64)
 
-    # ------------------------------------------------------------------
-    # Core filtering logic
-    # ------------------------------------------------------------------
+    for i, value in enumerate(cells):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            continue
+        arr = np.ravel(value) if isinstance(value, (list, tuple, np.ndarray)) else [value]
+        lengths[i] = len(arr)
+        arrays.append(arr)
 
-    def _apply_filter(
-            df: pd.DataFrame,
-            column: str,
-            mode: Literal["frame-wise", "any", "all"],
-            min_val: float | None = None,
-            max_val: float | None = None,
-            exact_val: float | str | None = None,
-            func: Callable[[pd.Series], pd.Series] | None = None,
-    ) -> pd.DataFrame:
+    mask = np.zeros(len(cells), dtype=bool)
+    filled = lengths > 0
+    if not filled.any():
+        return mask
 
-        filter_types = [
-            exact_val is not None,
-            min_val is not None or max_val is not None,
-            func is not None,
-        ]
+    flat = np.concatenate([np.asarray(arr) for arr in arrays if len(arr) > 0])
+    cond = _values_satisfy(flat, min_val=min_val, max_val=max_val, exact_val=exact_val)
 
-        if sum(filter_types) != 1:
-            raise ValueError("Exactly one of exact_value, range, or func must be provided.")
+    starts = np.cumsum(lengths[filled]) - lengths[filled]
+    mask[filled] = np.logical_and.reduceat(cond, starts)
 
-        series = df[column]
-
-        # ---------------- Callable filter (highest priority)
-        if func is not None:
-            """
-            # EXAMPLES
-            # Scalar/vectorised operations:
-            func = lambda s: s == exact_val
-            func = lambda s: s.between(min_val, max_val)
-            #
-            # Array/list operations:
-            func = lambda s: s.apply(lambda arr: np.mean(arr) > 2)
-            func = lambda s: s.apply(lambda arr: np.any(arr > 11) and np.all(arr > 11))  # non-empty only
-            """
-            row_mask = func(series)
-
-            if not isinstance(row_mask, pd.Series):
-                raise TypeError(f"'func' must return pandas Series, got {type(row_mask)}")
-
-            if not row_mask.index.equals(series.index):
-                raise ValueError("'func' must return Series aligned with input index")
-
-            if row_mask.dtype != bool:
-                raise TypeError("'func' must return boolean Series.")
-
-        # ---------------- Fast vectorised scalar/string paths
-        elif pd.api.types.is_string_dtype(series) and exact_val is not None:
-            row_mask = series == exact_val
-        elif pd.api.types.is_numeric_dtype(series) and exact_val is not None:
-            row_mask = series == exact_val
-        elif pd.api.types.is_numeric_dtype(series):  # numeric min/max
-            low = -np.inf if min_val is None else min_val
-            high = np.inf if max_val is None else max_val
-            row_mask = series.between(low, high)
-
-        # ---------------- Generic (arrays / objects)
-        else:
-            row_mask = series.apply(
-                _cell_satisfies,
-                min_val=min_val,
-                max_val=max_val,
-                exact_val=exact_val,
-            )
+    return mask
 
-        if row_mask.isna().any():
-            raise ValueError(
-                f"Non-boolean mask produced for column '{column}'. "
-                f"Check NaNs or invalid cell values."
-            )
 
-        # ---------------- Frame-wise
-        if mode == "frame-wise":
-            return df[row_mask]
-
-        # ---------------- Group-wise reduction
-        if mode == "any":
-            group_mask = row_mask.groupby(group_keys, observed=True).any()
-        elif mode == "all":
-            group_mask = row_mask.groupby(group_keys, observed=True).all()
-        else:
-            raise ValueError(f"Unknown mode '{mode}'")
+def _row_mask(
+        series: pd.Series,
+        spec: FilterSpec
+) -> np.ndarray:
+    # ---------------- Callable filter (highest priority)
+    if spec.func is not None:
         """
-        if mode == "any":
-            group_mask = row_mask.groupby(group_keys, observed=True).agg("any")
-        elif mode == "all":
-            group_mask = row_mask.groupby(group_keys, observed=True).agg(
-                lambda x: x.any() and x.all()
-            )
-        else:
-            raise ValueError(f"Unknown mode '{mode}'")
+        # EXAMPLES
+        # Scalar/vectorised operations:
+        func = lambda s: s == exact_val
+        func = lambda s: s.between(min_val, max_val)
+        #
+        # Array/list operations:
+        func = lambda s: s.apply(lambda arr: np.mean(arr) > 2)
+        func = lambda s: s.apply(lambda arr: np.any(arr > 11) and np.all(arr > 11))  # non-empty only
         """
+        row_mask = spec.func(series)
+
+        if not isinstance(row_mask, pd.Series):
+            raise TypeError(f"'func' must return pandas Series, got {type(row_mask)}")
+
+        if not row_mask.index.equals(series.index):
+            raise ValueError("'func' must return Series aligned with input index")
+
+        if row_mask.dtype != bool:
+            raise TypeError("'func' must return boolean Series.")
+
+    # ---------------- Fast vectorised scalar/string paths
+    elif pd.api.types.is_string_dtype(series) and spec.exact_val is not None:
+        row_mask = series == spec.exact_val
+    elif pd.api.types.is_numeric_dtype(series) and spec.exact_val is not None:
+        row_mask = series == spec.exact_val
+    elif pd.api.types.is_numeric_dtype(series):  # numeric min/max
+        low = -np.inf if spec.min_val is None else spec.min_val
+        high = np.inf if spec.max_val is None else spec.max_val
+        row_mask = series.between(low, high)
+
+    # ---------------- Categories: test each category once
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        category_mask = _cells_satisfy(
+            series.cat.categories.to_numpy(dtype=object),
+            min_val=spec.min_val,
+            max_val=spec.max_val,
+            exact_val=spec.exact_val,
+        )
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, category_mask[codes], False)
+
+    # ---------------- Generic (arrays / objects)
+    else:
+        return _cells_satisfy(
+            series.to_numpy(dtype=object),
+            min_val=spec.min_val,
+            max_val=spec.max_val,
+            exact_val=spec.exact_val,
+        )
+
+    if row_mask.isna().any():
+        raise ValueError(
+            f"Non-boolean mask produced for column '{spec.column}'. "
+            f"Check NaNs or invalid cell values."
+        )
+
+    return row_mask.to_numpy(dtype=bool)
+
+
+def plan_columns(
+        plan: list[FilterSpec]
+) -> list[str]:
+    """Columns a filter plan reads (including the group columns if it has group-wise filters)."""
+    columns = dict.fromkeys(spec.column for spec in plan)
+    if any(spec.mode != "frame-wise" for spec in plan):
+        columns.update(dict.fromkeys(GROUP_COLUMNS))
+    return list(columns)
+
+
+def pushdown_filters(
+        plan: list[FilterSpec],
+        pushable_columns: Collection[str]
+) -> tuple[list[tuple], list[FilterSpec]]:
+    """
+    Split a filter plan into pyarrow filters (a conjunction of (column, op, value) tuples for
+    `pd.read_parquet(filters=...)`) and the filters left to `apply_filter_plan`.
 
-        if group_mask.isna().any():
-            raise ValueError(
-                f"NaN encountered in group mask for column '{column}'."
-            )
+    Only frame-wise range / exact filters on pushable (scalar) columns are pushed, and only those before
+    the first group-wise or callable filter, as these depend on the rows the earlier filters kept.
+    Missing values fail the pushed comparisons, as they fail the filters.
+    """
+    pushed, remaining = [], []
+    blocked = False
 
-        keep_ids = group_mask[group_mask].index
-        idx = pd.MultiIndex.from_frame(df[group_cols])
+    for spec in plan:
+        blocked |= spec.mode != "frame-wise" or spec.func is not None
 
-        return df[idx.isin(keep_ids)]
+        if blocked or spec.column not in pushable_columns:
+            remaining.append(spec)
+        elif spec.exact_val is not None:
+            pushed.append((spec.column, "==", spec.exact_val))
+        else:
+            low = -np.inf if spec.min_val is None else spec.min_val
+            high = np.inf if spec.max_val is None else spec.max_val
+            pushed += [(spec.column, ">=", low), (spec.column, "<=", high)]
 
-    # ------------------------------------------------------------------
-    # Apply all filters sequentially
-    # ------------------------------------------------------------------
+    return pushed, remaining
 
-    for key, spec in filtering_kwargs.items():
 
-        # ---- Case 1: direct column
-        if key in df:
-            df = _apply_filter(
-                df,
-                column=key,
-                min_val=spec.get("min_value"),
-                max_val=spec.get("max_value"),
-                exact_val=spec.get("exact_value"),
-                mode=spec["mode"],
-                func=spec.get("func"),
-            )
+def filter_combined_df(
+        df: pd.DataFrame,
+        filtering_kwargs: dict
+) -> pd.DataFrame:
+    """
+    Filter a combined sunspot statistics DataFrame using flexible, hierarchical criteria.
+
+    The filters (see `plan_filters`) apply in order: group-wise modes reduce over the rows the previous
+    filters kept. All of them are evaluated as boolean masks over df, group-wise `any` / `all` on integer
+    (observation_id, sunspot_id) codes, and the rows are selected once at the end.
+    """
+    plan = plan_filters(df.columns, filtering_kwargs)
+    if not plan:
+        return df
+
+    return apply_filter_plan(df, plan)
+
+
+def apply_filter_plan(
+        df: pd.DataFrame,
+        plan: list[FilterSpec]
+) -> pd.DataFrame:
+    """Apply the filters of a plan (see `plan_filters`) to df, as `filter_combined_df`."""
+    alive = np.ones(len(df), dtype=bool)
+    group_codes = None
+
+    for spec in plan:
+        if spec.func is not None:
+            # callables see the remaining rows only, as if applied to the filtered frame
+            selected = alive.nonzero()[0]
+            row_mask = np.zeros(len(df), dtype=bool)
+            row_mask[selected] = _row_mask(df[spec.column].iloc[selected], spec)
+        else:
+            row_mask = _row_mask(df[spec.column], spec)
+
+        # ---------------- Frame-wise
+        if spec.mode == "frame-wise":
+            alive &= row_mask
             continue
 
-        # ---- Case 2: structured
-        part = key
-        for param, p_spec in spec.items():
-            col = _build_column_name(
-                part=part,
-                param=param,
-                stats_key=p_spec.get("stats_key", "Ic"),
-            )
+        # ---------------- Group-wise reduction (over the remaining rows)
+        if group_codes is None:
+            # MUST BE PRESENT FOR `MODE IN ["ALL", "ANY"]`, NOT FOR `MODE == "FRAME-WISE"
+            if not set(GROUP_COLUMNS).issubset(df.columns):
+                raise KeyError(f"Columns {GROUP_COLUMNS} are required for mode '{spec.mode}'")
+            group_codes = df.groupby(GROUP_COLUMNS, sort=False, observed=True, dropna=False).ngroup().to_numpy()
 
-            if col not in df.columns:
-                raise KeyError(f"Column '{col}' not found in DataFrame")
+        n_groups = int(group_codes.max()) + 1 if len(group_codes) else 0
+        if spec.mode == "any":
+            group_mask = np.bincount(group_codes[alive & row_mask], minlength=n_groups) > 0
+        else:
+            group_mask = np.bincount(group_codes[alive & ~row_mask], minlength=n_groups) == 0
 
-            df = _apply_filter(
-                df,
-                column=col,
-                min_val=p_spec.get("min_value"),
-                max_val=p_spec.get("max_value"),
-                exact_val=p_spec.get("exact_value"),
-                mode=p_spec["mode"],
-                func=p_spec.get("func"),
-            )
+        alive &= group_mask[group_codes]
 
-    return df
+    return df[alive]
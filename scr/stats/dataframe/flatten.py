@@ -1,9 +1,14 @@
 import numpy as np
+from itertools import chain
 import pandas as pd
 
 from scr.utils.types_alias import ObservationID, StatsByQuantity
 
 
+# a set, as the column order of the flattened frame follows its iteration order
+_VALID_PARTS = {"penumbra", "umbra", "ratio", "overall"}
+
+
 def flatten_spot_features_with_frame(all_stats: dict[ObservationID, StatsByQuantity]) -> pd.DataFrame:
     """
     Flatten nested sunspot statistics into a Pandas DataFrame.
@@ -26,7 +31,7 @@ def flatten_spot_features_with_frame(all_stats: dict[ObservationID, StatsByQuant
         - all numeric values: float32
     """
     records = []
-    valid_parts = {"penumbra", "umbra", "ratio", "overall"}
+    valid_parts = _VALID_PARTS
 
     for obs_id, quantities in all_stats.items():
 
@@ -131,8 +136,138 @@ def flatten_spot_features_with_frame(all_stats: dict[ObservationID, StatsByQuant
                 records.append(record)
 
     # Convert to DataFrame
-    df = pd.DataFrame(records)
+    return finalize_flat_stats(pd.DataFrame(records))
+
+
+def _row_columns(
+        signature: tuple
+) -> list[tuple[int, str, str]]:
+    """
+    (source index, parameter, column) of a row with the given signature, in the order
+    `flatten_spot_features_with_frame` writes them. The signature lists (quantity, part, parameters)
+    of the parts present in the frame; the source index points into it.
+    """
+    columns = []
+    written = set()
+
+    for i, (phys_q, part, params) in enumerate(signature):
+        # ratio / overall: once per frame, from the first quantity
+        if part in {"ratio", "overall"}:
+            if part not in written:
+                columns += [(i, param, f"{part}_{param}") for param in params]
+                written.add(part)
+            continue
+
+        # umbra / penumbra: fluxes per quantity, geometry once per frame
+        columns += [(i, param, f"{phys_q}_{part}_{param}") for param in params if "flux" in param]
+        if part not in written:
+            columns += [(i, param, f"{part}_{param}") for param in params if "flux" not in param]
+            written.add(part)
+
+    return columns
+
+
+def flatten_spot_features_columnar(all_stats: dict[ObservationID, StatsByQuantity]) -> pd.DataFrame:
+    """
+    Columnar equivalent of `flatten_spot_features_with_frame` (identical output, including the
+    column order and dtypes).
+
+    Rows sharing the layout of their parameters are gathered column by column into pre-sized
+    NumPy buffers instead of building one dict per row.
+    """
+    obs_ids, spot_ids, frames = [], [], []
+    row_sources = []  # per row: parameter dicts in the order of its signature
+    rows_by_signature: dict[tuple, list[int]] = {}
+    columns: dict[str, None] = {}  # ordered by first appearance, as in a DataFrame built from records
+    signature_columns: dict[tuple, list[tuple[int, str, str]]] = {}
+
+    for obs_id, quantities in all_stats.items():
+        spot_id_set = set().union(*(q.keys() for q in quantities.values()))
+
+        for spot_id in spot_id_set:
+            all_frames = set()
+            for spots in quantities.values():
+                if spot_id not in spots:
+                    continue
+                for part in _VALID_PARTS:
+                    if part in spots[spot_id]:
+                        all_frames.update(spots[spot_id][part].keys())
 
+            for frame in all_frames:
+                signature, sources = [], []
+                for phys_q, spots in quantities.items():
+                    if spot_id not in spots:
+                        continue
+                    spot_data = spots[spot_id]
+                    for part in _VALID_PARTS:
+                        if part in spot_data and frame in spot_data[part]:
+                            params = spot_data[part][frame]
+                            signature.append((phys_q, part, tuple(params)))
+                            sources.append(params)
+                signature = tuple(signature)
+
+                if signature not in signature_columns:
+                    signature_columns[signature] = _row_columns(signature)
+                    for _, _, column in signature_columns[signature]:
+                        columns.setdefault(column)
+
+                rows_by_signature.setdefault(signature, []).append(len(obs_ids))
+                obs_ids.append(obs_id)
+                spot_ids.append(spot_id)
+                frames.append(frame)
+                row_sources.append(sources)
+
+    n_rows = len(obs_ids)
+    values: dict[str, np.ndarray] = {}
+    complete: dict[str, np.ndarray] = {}  # rows with a (non-None) value
+
+    for signature, rows in rows_by_signature.items():
+        rows_idx = np.asarray(rows)
+        for i, param, column in signature_columns[signature]:
+            column_values = [row_sources[row][i][param] for row in rows]
+
+            if column not in values:
+                first = next((value for value in column_values if value is not None), None)
+                if isinstance(first, (list, tuple, np.ndarray)):
+                    values[column] = np.full(n_rows, np.nan, dtype=object)
+                else:
+                    values[column] = np.full(n_rows, np.nan, dtype=np.float32)
+                complete[column] = np.zeros(n_rows, dtype=bool)
+
+            if values[column].dtype == object:
+                # one float32 buffer split into per-row arrays
+                present = [(row, value) for row, value in zip(rows, column_values) if value is not None]
+                flat = np.array(list(chain.from_iterable(value for _, value in present)), dtype=np.float32)
+                start = 0
+                for row, value in present:
+                    values[column][row] = flat[start:start + len(value)]
+                    start += len(value)
+            else:
+                values[column][rows_idx] = np.array(
+                    [np.nan if value is None else value for value in column_values], dtype=np.float32
+                )
+            complete[column][rows_idx] = [value is not None for value in column_values]
+
+    data = {
+        "observation_id": np.array(obs_ids, dtype=object),
+        "sunspot_id": np.array(spot_ids, dtype=np.int32),
+        "frame": np.array(frames, dtype=np.int32),
+    }
+    for column in columns:
+        # as in a DataFrame built from records, missing values turn np.float32 columns into float64
+        if values[column].dtype != object and not complete[column].all():
+            data[column] = values[column].astype(np.float64)
+        else:
+            data[column] = values[column]
+
+    return finalize_flat_stats(pd.DataFrame(data))
+
+
+def finalize_flat_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Optimise the ID columns of flat statistics (one row per (observation_id, sunspot_id, frame)),
+    sort the rows and add the per-sunspot "spot_global_index".
+    """
     # Optimise ID columns
     df["observation_id"] = df["observation_id"].astype("category")
     df["sunspot_id"] = df["sunspot_id"].astype("int32")
@@ -142,15 +277,33 @@ def flatten_spot_features_with_frame(all_stats: dict[ObservationID, StatsByQuant
     df.sort_values(["observation_id", "sunspot_id", "frame"], inplace=True)
 
     # ---- Add per-sunspot local index ----
-    df["spot_global_index"] = (
-        df[["observation_id", "sunspot_id"]]
-        .astype(str)
-        .agg("::".join, axis=1)
-        .astype("category")
-        .cat.codes
-        .astype("int32")
-    )
+    # codes of the sorted "observation_id::sunspot_id" labels; the labels are only built per spot
+    group_codes = df.groupby(["observation_id", "sunspot_id"], sort=False, observed=True).ngroup().to_numpy()
+    _, first_rows = np.unique(group_codes, return_index=True)
+    labels = np.array([
+        f"{obs_id}::{spot_id}"
+        for obs_id, spot_id in zip(df["observation_id"].to_numpy()[first_rows], df["sunspot_id"].to_numpy()[first_rows])
+    ])
+    _, label_codes = np.unique(labels, return_inverse=True)
+    df["spot_global_index"] = label_codes[group_codes].astype("int32")
 
     df.reset_index(drop=True, inplace=True)
 
     return df
+
+
+def concat_flat_stats(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine flat statistics of separate observations (without "spot_global_index") into the DataFrame
+    the flattening of all of them at once gives: a column stays float32 only if it is complete in every part.
+    """
+    float32_columns = set.intersection(*(
+        {column for column in df.columns if df[column].dtype == np.float32} for df in dfs
+    )) if dfs else set()
+
+    df = pd.concat(dfs, ignore_index=True)
+    for column in df.columns:
+        if df[column].dtype == np.float32 and column not in float32_columns:
+            df[column] = df[column].astype(np.float64)
+
+    return finalize_flat_stats(df)
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Iterable, Sequence
+
+from scr.utils.types_alias import ObservationID, StatsByQuantity, SunspotID, FrameID
+from scr.utils.filesystem import check_dir
+
+from scr.stats.computation.registry import STAT_REGISTRY, plan_stats
+from scr.stats.dataframe.flatten import finalize_flat_stats
+
+
+ID_COLUMNS = ("observation_id", "sunspot_id", "frame")
+
+
+def flat_stats_columns(
+        quantities: Sequence[str],
+        stat_names: Sequence[str] | None = None
+) -> list[str]:
+    """
+    Columns of the flat statistics (as in `flatten_spot_features_with_frame`) of the given quantities and
+    statistics: "{part}_{param}" for geometry, "{quantity}_{part}_{param}" for fluxes,
+    "ratio_{param}" and "overall_{param}".
+    """
+    plan = plan_stats(stat_names)
+    part_outputs = [output for stat in plan.at_level("part") for output in STAT_REGISTRY[stat].outputs]
+
+    columns = list(ID_COLUMNS)
+    for part in ("penumbra", "umbra"):
+        columns += [f"{part}_{param}" for param in part_outputs if "flux" not in param]
+    for quantity in quantities:
+        for part in ("penumbra", "umbra"):
+            columns += [f"{quantity}_{part}_{param}" for param in part_outputs if "flux" in param]
+    for level in ("ratio", "overall"):
+        columns += [f"{level}_{param}" for stat in plan.at_level(level) for param in STAT_REGISTRY[stat].outputs]
+
+    return columns
+
+
+def flat_stats_schema(
+        columns: Sequence[str]
+) -> pa.Schema:
+    """Arrow schema of flat statistics: float32 values, `*_list` fields as list<float32> columns."""
+    fields = [
+        pa.field("observation_id", pa.string()),
+        pa.field("sunspot_id", pa.int32()),
+        pa.field("frame", pa.int32()),
+    ]
+    for column in columns:
+        if column in ID_COLUMNS:
+            continue
+        fields.append(pa.field(column, pa.list_(pa.float32()) if column.endswith("_list") else pa.float32()))
+
+    return pa.schema(fields)
+
+
+def _flat_value(
+        value
+):
+    if value is None:
+        return np.nan
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [np.nan if v is None else float(v) for v in value]
+    return float(value)
+
+
+def flatten_spot_frame(
+        obs_id: ObservationID,
+        sid: SunspotID,
+        t: FrameID,
+        stats_by_quantity: StatsByQuantity
+) -> dict:
+    """
+    One flat row of a spot in a frame, following the rules of `flatten_spot_features_with_frame`:
+    fluxes per quantity, everything else once per frame (from the first quantity that has it).
+    """
+    row = {"observation_id": obs_id, "sunspot_id": int(sid), "frame": int(t)}
+
+    for quantity, stats in stats_by_quantity.items():
+        spot_data = stats.get(sid)
+        if spot_data is None:
+            continue
+
+        for part in ("penumbra", "umbra", "ratio", "overall"):
+            params = spot_data.get(part, {}).get(t)
+            if params is None:
+                continue
+
+            for param, value in params.items():
+                if part in ("umbra", "penumbra") and "flux" in param:
+                    key = f"{quantity}_{part}_{param}"
+                else:
+                    key = f"{part}_{param}"
+                    if key in row:
+                        continue
+                row[key] = _flat_value(value)
+
+    return row
+
+
+class FlatStatsWriter:
+    """
+    Streams flat statistics rows to a Parquet file, one row group per `write_rows` call.
+
+    Rows (dicts as from `flatten_spot_frame`) may miss columns; those are stored as nulls.
+    Read the file back with `load_flat_stats`.
+    """
+
+    def __init__(
+            self,
+            filename: str,
+            columns: Sequence[str]
+    ):
+        check_dir(filename, is_file=True)
+        self.filename = filename
+        self.schema = flat_stats_schema(columns)
+        self.rows_written = 0
+        self._writer = pq.ParquetWriter(filename, self.schema)
+
+    def write_rows(
+            self,
+            rows: Iterable[dict]
+    ) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "FlatStatsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_flat_stats(
+        filenames: Sequence[str],
+        observation_ids: Sequence[ObservationID] | None = None
+) -> pd.DataFrame:
+    """
+    Load streamed flat statistics of one or more observations into the DataFrame
+    `flatten_spot_features_with_frame` returns (list columns as arrays of float32).
+    If given, observation_ids replace the stored observation IDs file by file.
+    """
+    dfs = [pd.read_parquet(filename) for filename in filenames]
+    if observation_ids is not None:
+        for df, obs_id in zip(dfs, observation_ids):
+            df["observation_id"] = obs_id
+    df = pd.concat(dfs, ignore_index=True)
+
+    for column in df.columns:
+        if column.endswith("_list"):
+            df[column] = [np.asarray(value, dtype=np.float32) if value is not None else np.nan
+                          for value in df[column]]
+
+    return finalize_flat_stats(df)
@@ -2,6 +2,33 @@ import numpy as np
 import pandas as pd
 
 
+_SEGMENT_COLUMNS = {
+    "segment_slope": "slope",
+    "segment_relative_slope": "relative_slope",
+    "phase_duration": "duration",
+}
+
+
+def _joint_spot_codes(
+        combined_df: pd.DataFrame,
+        segments_df: pd.DataFrame
+) -> tuple[np.ndarray, np.ndarray]:
+    # common integer codes of (observation_id, sunspot_id) in both frames, -1 for missing keys
+    codes = []
+    for column in ("observation_id", "sunspot_id"):
+        values = np.concatenate([
+            combined_df[column].to_numpy(dtype=object),
+            segments_df[column].to_numpy(dtype=object),
+        ])
+        column_codes, uniques = pd.factorize(values)
+        codes.append((column_codes, len(uniques)))
+
+    (obs_codes, _), (sid_codes, n_sids) = codes
+    spot_codes = np.where((obs_codes >= 0) & (sid_codes >= 0), obs_codes.astype(np.int64) * n_sids + sid_codes, -1)
+
+    return spot_codes[:len(combined_df)], spot_codes[len(combined_df):]
+
+
 def apply_segments_to_combined_df(
         combined_df: pd.DataFrame,
         segments_df: pd.DataFrame,
@@ -9,44 +36,57 @@ def apply_segments_to_combined_df(
     """
     Annotate combined_df with segment-wise quantities
     (slope, relative slope, phase duration) in place.
+
+    A row gets the values of the segments of its (observation_id, sunspot_id) with
+    round(start) <= frame <= round(stop); if segments overlap, the later one in segments_df wins.
+    Implemented as an interval join: the rows are sorted by (spot, frame), the frame range of each
+    segment is located by binary search and all columns are assigned at once.
     """
 
-    for col in ["segment_slope", "segment_relative_slope", "phase_duration"]:
+    for col in _SEGMENT_COLUMNS:
         if col not in combined_df:
             combined_df[col] = np.float32(np.nan)
 
-    # --- group once
-    combined_groups = combined_df.groupby(
-        ["observation_id", "sunspot_id"],
-        observed=True,
-        sort=False,
-    )
-
-    segment_groups = segments_df.groupby(
-        ["observation_id", "sunspot_id"],
-        observed=True,
-        sort=False,
-    )
-
-    # --- iterate only over overlapping keys
-    for key, seg_group in segment_groups:
-        if key not in combined_groups.groups:
-            continue
-
-        idx = combined_groups.groups[key]
-        frames = combined_df.loc[idx, "frame"].to_numpy()
-
-        for _, seg in seg_group.iterrows():
-            mask = (
-                (frames >= np.round(seg["start"])) &
-                (frames <= np.round(seg["stop"]))
-            )
-
-            if not mask.any():
-                continue
-
-            loc = idx[mask]
-
-            combined_df.loc[loc, "segment_slope"] = np.float32(seg["slope"])
-            combined_df.loc[loc, "segment_relative_slope"] = np.float32(seg["relative_slope"])
-            combined_df.loc[loc, "phase_duration"] = np.float32(seg["duration"])
+    if len(combined_df) == 0 or len(segments_df) == 0:
+        return
+
+    row_spots, seg_spots = _joint_spot_codes(combined_df, segments_df)
+    frames = combined_df["frame"].to_numpy(dtype=np.int64)
+
+    # --- rows sorted by (spot, frame) as one composite key; frames shifted into [1, span - 2]
+    frame_min, frame_max = frames.min(), frames.max()
+    span = frame_max - frame_min + 3
+
+    order = np.lexsort((frames, row_spots))
+    sorted_keys = row_spots[order] * span + (frames[order] - frame_min + 1)
+
+    # --- frame range of every segment (empty for unknown spots and missing bounds)
+    start = np.round(segments_df["start"].to_numpy(dtype=np.float64))
+    stop = np.round(segments_df["stop"].to_numpy(dtype=np.float64))
+    valid = (seg_spots >= 0) & ~np.isnan(start) & ~np.isnan(stop)
+
+    start = np.clip(np.nan_to_num(start), frame_min - 1, frame_max + 1).astype(np.int64)
+    stop = np.clip(np.nan_to_num(stop), frame_min - 1, frame_max + 1).astype(np.int64)
+
+    lo = np.searchsorted(sorted_keys, seg_spots * span + (start - frame_min + 1), side="left")
+    hi = np.searchsorted(sorted_keys, seg_spots * span + (stop - frame_min + 1), side="right")
+    lengths = np.where(valid, np.maximum(hi - lo, 0), 0)
+
+    if lengths.sum() == 0:
+        return
+
+    # --- expand the ranges; the last matching segment (in segments_df order) wins
+    segment_index = np.repeat(np.arange(len(segments_df)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = order[np.repeat(lo, lengths) + offsets]
+
+    winner = np.full(len(combined_df), -1, dtype=np.int64)
+    np.maximum.at(winner, rows, segment_index)
+
+    matched = np.flatnonzero(winner >= 0)
+    winner = winner[matched]
+
+    for col, seg_col in _SEGMENT_COLUMNS.items():
+        values = combined_df[col].to_numpy(copy=True)
+        values[matched] = segments_df[seg_col].to_numpy(dtype=np.float32)[winner]
+        combined_df[col] = values
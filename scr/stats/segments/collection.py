@@ -1,124 +1,208 @@
+import hashlib
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from os import path
 from tqdm import tqdm
 
 from scr.config.paths import PATH_CONTOURS_PHASES, SLOPES_FILE
+from scr.config.numerics import RND_SEED
 
 from scr.utils.filesystem import check_dir, is_empty
 from scr.utils.numerics import find_outliers1D
 
 from scr.io.parquet import save_parquet
+from scr.io.pickle import load_pickle, save_pickle
 
 from scr.stats.segments.fitting import fit_optimal_piecewise_linear_model
 
 
+# bump when the fitting or the segment statistics change to invalidate cached fits
+SLOPES_CACHE_VERSION = 1
+
+
+def slopes_cache_path(
+        slopes_file: str = SLOPES_FILE
+) -> str:
+    return slopes_file.replace(".parquet", "_cache.pkl")
+
+
+def _prepare_flux_series(
+        g: pd.DataFrame
+) -> tuple[np.ndarray, np.ndarray, float] | None:
+    """Time axis, normalised total flux (finite, outliers removed) and flux maximum of one spot; None if too short."""
+
+    # ----------------------------------------------------------
+    # Time axis + total flux
+    # ----------------------------------------------------------
+
+    t = g["frame"].to_numpy(dtype=float)
+    total_flux = np.nansum(
+        [
+            g["Br_umbra_corrected_flux_total"].to_numpy(dtype=float),
+            g["Br_penumbra_corrected_flux_total"].to_numpy(dtype=float),
+        ],
+        axis=0,
+    )
+
+    # ----------------------------------------------------------
+    # Finite / outlier handling
+    # ----------------------------------------------------------
+
+    total_flux = np.abs(total_flux)
+
+    idx_finite = np.isfinite(total_flux)
+    t, total_flux = t[idx_finite], total_flux[idx_finite]
+    if np.sum(idx_finite) <= 1:
+        return None
+
+    total_flux[find_outliers1D(total_flux, t, max_iter=1)] = np.nan
+    idx_finite = np.isfinite(total_flux)
+    t, total_flux = t[idx_finite], total_flux[idx_finite]
+    if np.sum(idx_finite) <= 1:
+        return None
+
+    # ----------------------------------------------------------
+    # Normalisation
+    # ----------------------------------------------------------
+
+    flux_max = np.nanmax(total_flux)
+    total_flux /= flux_max  # normalise
+
+    return t, total_flux, flux_max
+
+
+def _fit_key(
+        t: np.ndarray,
+        total_flux: np.ndarray,
+        flux_max: float,
+        fit_kwargs: dict,
+        seed: int
+) -> str:
+    sha = hashlib.sha1()
+    sha.update(repr((SLOPES_CACHE_VERSION, float(flux_max), seed, sorted(fit_kwargs.items()))).encode())
+    sha.update(np.ascontiguousarray(t, dtype=np.float64).tobytes())
+    sha.update(np.ascontiguousarray(total_flux, dtype=np.float64).tobytes())
+    return sha.hexdigest()
+
+
+def _fit_segments(
+        task: tuple[np.ndarray, np.ndarray, float, dict, int, str | None]
+) -> list[dict]:
+    """Segment statistics (without IDs) of the optimal piecewise-linear fit of one spot; plots the fit if outfile."""
+    t, total_flux, flux_max, fit_kwargs, seed, outfile = task
+
+    model, results = fit_optimal_piecewise_linear_model(t, total_flux, seed=seed, verbose=False, **fit_kwargs)
+
+    if model is None:
+        return []
+
+    if outfile is not None:
+        from scr.stats.segments.control_plots import plot_flux_fit_control
+
+        plot_flux_fit_control(
+            t=t,
+            total_flux=total_flux,
+            model=model,
+            outfile=outfile
+        )
+
+    # ----------------------------------------------------------
+    # Segment loop
+    # ----------------------------------------------------------
+
+    segments = []
+    for i in range(len(model.fit_breaks) - 1):
+        x0 = model.fit_breaks[i]
+        x1 = model.fit_breaks[i + 1]
+        slope = model.slopes[i]
+
+        y0 = model.predict([x0])[0]
+        y1 = model.predict([x1])[0]
+
+        # total_flux = slope * t + intercept; t in [start; stop]
+        intercept = y0 - slope * x0
+        relative_slope = slope / y0 if y0 != 0. else np.nan
+
+        segments.append({
+            "segment_index": i,
+            "start": x0,
+            "stop": x1,
+            "duration": x1 - x0,
+            "slope": slope,
+            "intercept": intercept,
+            "flux_max": flux_max,
+            "flux_start": y0,
+            "flux_stop": y1,
+            "mean_flux": 0.5 * (y0 + y1),
+            "relative_slope": relative_slope
+        })
+
+    return segments
+
+
 def collect_slopes(
         df: pd.DataFrame,
-        control_plots: bool = False
+        control_plots: bool = False,
+        n_workers: int = 1,
+        use_cache: bool = True,
+        seed: int = RND_SEED,
+        fit_kwargs: dict | None = None
 ) -> pd.DataFrame:
     """
     Fit piecewise-linear models to total magnetic flux evolution
     for each spot and return segment-level statistics.
+
+    Fits are cached per spot (next to SLOPES_FILE) under a hash of the fitted series and the fit settings,
+    so only spots whose flux series changed are refitted; the rest are fitted on n_workers processes.
+    Every spot is fitted with the same seed, so the result does not depend on the number of workers.
+    Control plots are only drawn for refitted spots.
     """
     segments: list[dict] = []
+    fit_kwargs = fit_kwargs or {}
 
     if is_empty(df):
         raise ValueError("No contour files at the input")
 
     if control_plots:
         from scr.config.paths import PATH_FIGURES
-        from scr.stats.segments.control_plots import plot_flux_fit_control
 
         fig_outdir = path.join(PATH_FIGURES, "flux_fit")
         check_dir(fig_outdir, is_file=False)
 
-    for _, g in tqdm(df.groupby("spot_global_index", observed=True)):
-
-        # ----------------------------------------------------------
-        # Time axis + total flux
-        # ----------------------------------------------------------
+    cache_file = slopes_cache_path()
+    cache = load_pickle(cache_file) if use_cache and path.isfile(cache_file) else {}
 
-        t = g["frame"].to_numpy(dtype=float)
-        total_flux = np.nansum(
-            [
-                g["Br_umbra_corrected_flux_total"].to_numpy(dtype=float),
-                g["Br_penumbra_corrected_flux_total"].to_numpy(dtype=float),
-            ],
-            axis=0,
-        )
-
-        # ----------------------------------------------------------
-        # Finite / outlier handling
-        # ----------------------------------------------------------
-
-        total_flux = np.abs(total_flux)
-
-        idx_finite = np.isfinite(total_flux)
-        t, total_flux = t[idx_finite], total_flux[idx_finite]
-        if np.sum(idx_finite) <= 1:
-            continue
-
-        total_flux[find_outliers1D(total_flux, t, max_iter=1)] = np.nan
-        idx_finite = np.isfinite(total_flux)
-        t, total_flux = t[idx_finite], total_flux[idx_finite]
-        if np.sum(idx_finite) <= 1:
+    spots, tasks = [], {}
+    for _, g in df.groupby("spot_global_index", observed=True):
+        series = _prepare_flux_series(g)
+        if series is None:
             continue
 
-        # ----------------------------------------------------------
-        # Normalisation + fitting
-        # ----------------------------------------------------------
+        obs_id = g["observation_id"].iloc[0]
+        sunspot_id = g["sunspot_id"].iloc[0]
+        key = _fit_key(*series, fit_kwargs=fit_kwargs, seed=seed)
+        spots.append((obs_id, sunspot_id, key))
 
-        flux_max = np.nanmax(total_flux)
-        total_flux /= flux_max  # normalise
-        model, results = fit_optimal_piecewise_linear_model(t, total_flux, verbose=False)
+        if key not in cache and key not in tasks:
+            outfile = None
+            if control_plots:
+                basename = path.basename(obs_id).replace(".npz", f"_{sunspot_id:04d}.jpg")
+                outfile = path.join(fig_outdir, basename)
+            tasks[key] = (*series, fit_kwargs, seed, outfile)
 
-        if model is None:
-            continue
+    print(f"Fitting {len(tasks)} of {len(spots)} spots ({len(spots) - len(tasks)} cached)...")
 
-        obs_id = g["observation_id"].iloc[0]
-        sunspot_id = g["sunspot_id"].iloc[0]
+    if n_workers == 1:
+        fitted = list(tqdm(map(_fit_segments, tasks.values()), total=len(tasks)))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers if n_workers > 0 else None) as executor:
+            fitted = list(tqdm(executor.map(_fit_segments, tasks.values()), total=len(tasks)))
+    cache.update(zip(tasks.keys(), fitted))
 
-        if control_plots:
-            basename = path.basename(obs_id).replace(".npz", f"_{sunspot_id:04d}.jpg")
-            plot_flux_fit_control(
-                t=t,
-                total_flux=total_flux,
-                model=model,
-                outfile=path.join(fig_outdir, basename)
-            )
-
-        # ----------------------------------------------------------
-        # Segment loop
-        # ----------------------------------------------------------
-
-        for i in range(len(model.fit_breaks) - 1):
-            x0 = model.fit_breaks[i]
-            x1 = model.fit_breaks[i + 1]
-            slope = model.slopes[i]
-
-            y0 = model.predict([x0])[0]
-            y1 = model.predict([x1])[0]
-
-            # total_flux = slope * t + intercept; t in [start; stop]
-            intercept = y0 - slope * x0
-            relative_slope = slope / y0 if y0 != 0. else np.nan
-
-            segments.append({
-                "observation_id": obs_id,
-                "sunspot_id": sunspot_id,
-                "segment_index": i,
-                "start": x0,
-                "stop": x1,
-                "duration": x1 - x0,
-                "slope": slope,
-                "intercept": intercept,
-                "flux_max": flux_max,
-                "flux_start": y0,
-                "flux_stop": y1,
-                "mean_flux": 0.5 * (y0 + y1),
-                "relative_slope": relative_slope
-            })
+    for obs_id, sunspot_id, key in spots:
+        for segment in cache[key]:
+            segments.append({"observation_id": obs_id, "sunspot_id": sunspot_id} | segment)
 
     segments_df = pd.DataFrame(segments)
 
@@ -134,5 +218,7 @@ def collect_slopes(
 
     check_dir(PATH_CONTOURS_PHASES)
     save_parquet(filename=SLOPES_FILE, df=segments_df)
+    if use_cache:
+        save_pickle(cache_file, cache)
 
     return segments_df
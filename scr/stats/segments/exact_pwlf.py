@@ -0,0 +1,201 @@
+import numpy as np
+from scipy.optimize import minimize
+from typing import Iterator
+
+
+class SegmentedLinearFit:
+    """
+    Continuous piecewise-linear least-squares fit with given breakpoints.
+    Mirrors the parts of `pwlf.PiecewiseLinFit` used here: fit_breaks, beta, slopes, intercepts, ssr, predict.
+    """
+
+    def __init__(
+            self,
+            x: np.ndarray,
+            y: np.ndarray,
+            breaks: np.ndarray
+    ):
+        self.x_data = np.asarray(x, dtype=float)
+        self.y_data = np.asarray(y, dtype=float)
+        self.fit_breaks = np.asarray(breaks, dtype=float)
+        self.n_segments = len(self.fit_breaks) - 1
+        self.n_parameters = self.n_segments + 1
+
+        A = self._basis(self.x_data)
+        self.beta, *_ = np.linalg.lstsq(A, self.y_data, rcond=None)
+
+        residuals = self.y_data - A @ self.beta
+        self.ssr = float(residuals @ residuals)
+
+        self.slopes = np.cumsum(self.beta[1:])
+        self.intercepts = self.predict(self.fit_breaks[:-1]) - self.slopes * self.fit_breaks[:-1]
+
+    def _basis(
+            self,
+            x: np.ndarray
+    ) -> np.ndarray:
+        # [1, x - b0, max(x - b1, 0), ..., max(x - b_{n-1}, 0)] as in pwlf
+        x = np.asarray(x, dtype=float)
+        columns = [np.ones_like(x), x - self.fit_breaks[0]]
+        columns += [np.maximum(x - brk, 0.) for brk in self.fit_breaks[1:-1]]
+        return np.column_stack(columns)
+
+    def predict(
+            self,
+            x: np.ndarray
+    ) -> np.ndarray:
+        return self._basis(x) @ self.beta
+
+
+def _segment_costs(
+        x: np.ndarray,
+        y: np.ndarray
+) -> np.ndarray:
+    """
+    cost[i, j]: SSR of the least-squares line through points i..j-1 (inf for fewer than 2 points),
+    from prefix sums of 1, x, y, x^2, xy and y^2.
+    """
+    n = len(x)
+    x = x - np.mean(x)
+    y = y - np.mean(y)
+
+    prefix = [np.concatenate([[0.], np.cumsum(values)]) for values in (np.ones(n), x, y, x * x, x * y, y * y)]
+    s1, sx, sy, sxx, sxy, syy = (p[None, :] - p[:, None] for p in prefix)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_x = sxx - sx * sx / s1
+        cov_xy = sxy - sx * sy / s1
+        var_y = syy - sy * sy / s1
+        cost = var_y - np.where(var_x > 0., cov_xy * cov_xy / var_x, 0.)
+
+    cost = np.maximum(cost, 0.)
+    cost[s1 < 2] = np.inf
+
+    return cost
+
+
+def optimal_partitions(
+        x: np.ndarray,
+        y: np.ndarray,
+        max_segments: int
+) -> list[np.ndarray]:
+    """
+    Exact optimal partitions of the (x-sorted) points into 1..max_segments contiguous segments of at least
+    two points, minimising the total SSR of independent lines (dynamic programme, O(n^2 * max_segments)).
+
+    Returns, per segment count, the start indices of the segments followed by n
+    (fewer entries if the points do not allow more segments).
+    """
+    n = len(x)
+    cost = _segment_costs(x, y)
+
+    # best[j]: minimal SSR of the first j points in k segments; argmin[k][j]: start of the last segment
+    best = cost[0]
+    argmins = [np.zeros(n + 1, dtype=int)]
+    partitions = [np.array([0, n])]
+
+    for k in range(2, max_segments + 1):
+        total = best[:, None] + cost
+        argmin = np.argmin(total, axis=0)
+        best = total[argmin, np.arange(n + 1)]
+        argmins.append(argmin)
+
+        if not np.isfinite(best[n]):
+            break
+
+        starts = [n]
+        for level in range(k - 1, -1, -1):
+            starts.append(argmins[level][starts[-1]])
+        partitions.append(np.array(starts[::-1]))
+
+    return partitions
+
+
+def _best_single_break(
+        x: np.ndarray,
+        y: np.ndarray
+) -> SegmentedLinearFit:
+    """
+    Globally optimal continuous fit with one inner break (Hudson's two-phase regression): between two
+    consecutive x values the optimum is either the crossing of the separate least-squares lines on each side,
+    when it falls inside, or one of the x values, so all of these candidates are fitted.
+    """
+    candidates = list(np.unique(x[1:-1]))
+
+    for i in range(2, len(x) - 1):
+        if x[i - 1] == x[i] or x[0] == x[i - 1] or x[i] == x[-1]:
+            continue
+        slope_left, intercept_left = np.polyfit(x[:i], y[:i], 1)
+        slope_right, intercept_right = np.polyfit(x[i:], y[i:], 1)
+        if slope_left != slope_right:
+            crossing = (intercept_right - intercept_left) / (slope_left - slope_right)
+            if x[i - 1] < crossing < x[i]:
+                candidates.append(crossing)
+
+    fits = (SegmentedLinearFit(x, y, np.array([x[0], brk, x[-1]])) for brk in candidates)
+    return min(fits, key=lambda fit: fit.ssr)
+
+
+def _polish_breaks(
+        x: np.ndarray,
+        y: np.ndarray,
+        guesses: list[np.ndarray]
+) -> SegmentedLinearFit:
+    # local (L-BFGS-B) minimisation of the continuous SSR over the inner breaks, best of the distinct guesses
+    def ssr(inner: np.ndarray) -> float:
+        return SegmentedLinearFit(x, y, np.concatenate([[x[0]], np.sort(inner), [x[-1]]])).ssr
+
+    best = None
+    for guess in np.unique(np.sort(guesses, axis=1), axis=0):
+        result = minimize(ssr, guess, method="L-BFGS-B", bounds=[(x[0], x[-1])] * len(guess))
+        if best is None or result.fun < best.fun:
+            best = result
+
+    return SegmentedLinearFit(x, y, np.concatenate([[x[0]], np.sort(best.x), [x[-1]]]))
+
+
+def exact_piecewise_linear_fits(
+        x: np.ndarray,
+        y: np.ndarray,
+        max_segments: int,
+        polish: bool = True
+) -> Iterator[SegmentedLinearFit]:
+    """
+    Continuous piecewise-linear fits with 1, 2, ..., max_segments segments (lazily, stops early if the
+    points do not allow more segments). Deterministic replacement of `pwlf.PiecewiseLinFit.fit`.
+
+    The segments come from the exact optimal partition of all segment counts (`optimal_partitions`, one pass);
+    the breakpoints are put midway between neighbouring segments and the continuous model is fitted by least
+    squares on them. As the partition allows jumps between segments, it is only exact for the discontinuous
+    model. With polish=True, the 2-segment fit is the exact continuous optimum (`_best_single_break`) and the
+    inner breakpoints of more segments are refined on the continuous SSR by a local search from several distinct
+    starts (the partition, quantiles of x, the previous fit split at each partition breakpoint or mid-segment),
+    so they are not guaranteed optimal.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+
+    previous = None
+    for starts in optimal_partitions(x, y, max_segments):
+        inner_starts = starts[1:-1]
+        inner = 0.5 * (x[inner_starts - 1] + x[inner_starts])
+
+        if polish and len(inner) == 1:
+            fit = _best_single_break(x, y)
+        elif polish and len(inner) > 1:
+            # the partition, evenly spaced quantiles of x, and the previous fit split at each partition breakpoint
+            # or in the middle of a segment
+            quantiles = np.quantile(x, np.arange(1, len(inner) + 1) / (len(inner) + 1))
+            splits = np.concatenate([inner, 0.5 * (previous.fit_breaks[:-1] + previous.fit_breaks[1:])])
+            guesses = [inner, quantiles] + [np.append(previous.fit_breaks[1:-1], brk) for brk in splits]
+            fit = _polish_breaks(x, y, guesses)
+        else:
+            fit = SegmentedLinearFit(x, y, np.concatenate([[x[0]], inner, [x[-1]]]))
+
+        previous = fit
+        yield fit
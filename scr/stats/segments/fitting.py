@@ -1,7 +1,11 @@
 import numpy as np
 from pwlf import PiecewiseLinFit
+from typing import Literal
 
-from scr.stats.segments.simple_pwlf import piecewise_linear_fit
+from scr.config.numerics import RND_SEED
+
+from scr.stats.segments.exact_pwlf import SegmentedLinearFit, exact_piecewise_linear_fits
+from scr.stats.segments.simple_pwlf import piecewise_linear_fit, piecewise_linear_fit_warm
 
 
 def _poor_improvement_penalisation(
@@ -21,8 +25,11 @@ def fit_optimal_piecewise_linear_model(
         use_aic: bool = False,
         use_bic: bool = False,
         normalize_y: bool = False,
+        seed: int = RND_SEED,
+        engine: Literal["pwlf", "exact"] = "pwlf",
+        warm_start: bool = False,
         verbose: bool = True
-) -> tuple[PiecewiseLinFit | None, dict]:
+) -> tuple[PiecewiseLinFit | SegmentedLinearFit | None, dict]:
     """
     Fit piecewise linear models with increasing number of segments and choose the optimal one.
     (Improved with grace_attempts before early stopping)
@@ -45,12 +52,21 @@ def fit_optimal_piecewise_linear_model(
         If True, use Bayesian Information Criterion instead of AIC.
     normalize_y : bool
         If True, normalize y to [0, 1] for numerical stability.
+    seed : int
+        Seed of the optimiser; the same for every segment count.
+    engine : {"pwlf", "exact"}
+        "pwlf" fits each segment count by pwlf's differential evolution; "exact" gets all segment counts
+        from one exact optimal-partition dynamic programme (see `exact_piecewise_linear_fits`), deterministic.
+    warm_start : bool
+        With engine "pwlf", start each fit from the breakpoints of the previous one plus a split of its
+        worst-residual segment (local optimisation on shared data, see `piecewise_linear_fit_warm`)
+        instead of a global optimisation per segment count.
     verbose : bool
         If True, print progress.
 
     Returns
     -------
-    best_model : pwlf.PiecewiseLinFit
+    best_model : pwlf.PiecewiseLinFit or SegmentedLinearFit
         Fitted model with optimal number of segments.
     results : dict
         Dictionary with all errors, aic, bic, and breakpoints per segment count.
@@ -74,10 +90,22 @@ def fit_optimal_piecewise_linear_model(
         grace_attempts = max_grace_attempts
     grace_attempts = int(min(grace_attempts, max_grace_attempts))
 
+    if engine not in ("pwlf", "exact"):
+        raise ValueError(f"Unknown engine '{engine}'. Available options are 'pwlf' and 'exact'.")
+
     max_segments = int(np.clip(np.ceil(len(t) / 2) - 1, a_min=1, a_max=max_segments))
+    exact_fits = exact_piecewise_linear_fits(t, y, max_segments) if engine == "exact" else None
+    warm_base = PiecewiseLinFit(t, y, seed=seed) if engine == "pwlf" and warm_start else None
+    model = None
+
     for i in range(1, max_segments + 1):
         try:
-            model = piecewise_linear_fit(x=t, y=y, n_segments=i)
+            if exact_fits is not None:
+                model = next(exact_fits)
+            elif warm_base is not None:
+                model = piecewise_linear_fit_warm(warm_base, previous=model)
+            else:
+                model = piecewise_linear_fit(x=t, y=y, n_segments=i, seed=seed)
         except Exception as e:
             if verbose:
                 print(f"  Failed to fit {i} segments: {e}")
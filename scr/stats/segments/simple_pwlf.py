@@ -1,5 +1,6 @@
 import pwlf
 import numpy as np
+from copy import copy
 
 from scr.config.numerics import RND_SEED
 
@@ -15,3 +16,48 @@ def piecewise_linear_fit(
     model.fit(n_segments)
 
     return model
+
+
+def _split_guesses(
+        model: pwlf.PiecewiseLinFit
+) -> list[np.ndarray]:
+    # inner breaks of the model plus a split of its worst-residual segment (at the middle and at the worst point)
+    x, y = model.x_data, model.y_data
+    breaks = model.fit_breaks
+
+    residuals = y - model.predict(x)
+    segment = np.clip(np.searchsorted(breaks, x, side="right") - 1, 0, len(breaks) - 2)
+    worst = np.argmax(np.bincount(segment, weights=residuals ** 2, minlength=len(breaks) - 1))
+
+    in_worst = segment == worst
+    candidates = [0.5 * (breaks[worst] + breaks[worst + 1])]
+    worst_point = x[in_worst][np.argmax(np.abs(residuals[in_worst]))]
+    if breaks[worst] < worst_point < breaks[worst + 1] and worst_point != candidates[0]:
+        candidates.append(worst_point)
+
+    return [np.sort(np.append(breaks[1:-1], candidate)) for candidate in candidates]
+
+
+def piecewise_linear_fit_warm(
+        base: pwlf.PiecewiseLinFit,
+        previous: pwlf.PiecewiseLinFit | None = None
+) -> pwlf.PiecewiseLinFit:
+    """
+    Fit with one segment more than `previous` (one segment if None) by a local optimisation (`fit_guess`)
+    started from the breakpoints of `previous` plus a split of its worst-residual segment.
+
+    base: unfitted model of the data; it is copied (sharing the data) for every fit and left unchanged.
+    """
+    if previous is None:
+        model = copy(base)
+        model.fit_with_breaks([base.break_0, base.break_n])
+        return model
+
+    best = None
+    for guess in _split_guesses(previous):
+        model = copy(base)
+        model.fit_guess(guess)
+        if best is None or model.ssr < best.ssr:
+            best = model
+
+    return best
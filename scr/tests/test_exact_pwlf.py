@@ -0,0 +1,34 @@
+import numpy as np
+from pwlf import PiecewiseLinFit
+
+from scr.stats.segments.exact_pwlf import SegmentedLinearFit, exact_piecewise_linear_fits
+
+
+def _series(seed: int, n: int = 40) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    # random walks: the partition breakpoint is often a poor start for the continuous fit
+    x = np.sort(rng.uniform(0, 10, n))
+    y = np.cumsum(rng.normal(size=n))
+    return x, y
+
+
+def test_two_segments_never_worse_than_pwlf() -> None:
+    for seed in range(12):
+        x, y = _series(seed)
+        fit = list(exact_piecewise_linear_fits(x, y, max_segments=2))[1]
+
+        model = PiecewiseLinFit(x, y, seed=seed)
+        model.fit(2)
+
+        assert fit.ssr <= model.ssr * (1 + 1e-9), seed
+
+
+def test_two_segments_match_break_scan() -> None:
+    # the single inner break is globally optimal, not only among the x values
+    x, y = _series(9)
+    fit = list(exact_piecewise_linear_fits(x, y, max_segments=2))[1]
+
+    grid = np.linspace(x[0], x[-1], 2001)[1:-1]
+    best_on_grid = min(SegmentedLinearFit(x, y, np.array([x[0], brk, x[-1]])).ssr for brk in grid)
+
+    assert fit.ssr <= best_on_grid * (1 + 1e-9)
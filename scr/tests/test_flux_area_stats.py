@@ -0,0 +1,67 @@
+import numpy as np
+
+from scr.stats.computation.masks import overall_mask
+from scr.stats.computation.flux import compute_flux_area_stats
+from scr.stats.computation.sparse import MaskMatrixBuilder, compute_mask_matrix_flux_stats
+
+
+SHAPE = (60, 70)
+GLOBAL_KEYS = ("flux_total", "flux_mean", "flux_std", "corrected_flux_total", "corrected_flux_mean",
+               "corrected_flux_std")
+
+
+def _maps() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(1)
+    image = rng.normal(1000, 100, SHAPE)
+    image[5, 5] = np.nan
+    mu2d = rng.uniform(0.2, 1, SHAPE)
+    return image, mu2d
+
+
+def _box(rows: slice, cols: slice, value: float) -> np.ndarray:
+    mask = np.zeros(SHAPE, dtype=np.float32)
+    mask[rows, cols] = value
+    return mask
+
+
+def _sparse_stats(image: np.ndarray, masks: list[np.ndarray], mu2d: np.ndarray) -> dict:
+    builder = MaskMatrixBuilder(SHAPE)
+    builder.add("group", masks)
+    return compute_mask_matrix_flux_stats(builder.build(), image, mu2d=mu2d)["group"]
+
+
+def _check_global_stats(masks: list[np.ndarray]) -> dict:
+    image, mu2d = _maps()
+    dense = compute_flux_area_stats(image, masks, SHAPE, mu2d=mu2d)
+    sparse = _sparse_stats(image, masks, mu2d)
+    # the global statistics are those of the overall (summed and clipped) mask
+    reference = compute_flux_area_stats(image, [overall_mask(masks, shape=SHAPE)], SHAPE, mu2d=mu2d)
+
+    for key in GLOBAL_KEYS:
+        np.testing.assert_allclose(dense[key], reference[key], rtol=1e-8, equal_nan=True, err_msg=key)
+        np.testing.assert_allclose(sparse[key], dense[key], rtol=1e-8, equal_nan=True, err_msg=key)
+
+    return dense
+
+
+def test_overlapping_masks_match_overall_mask() -> None:
+    masks = [
+        _box(slice(10, 30), slice(10, 30), 1.0),
+        _box(slice(20, 40), slice(20, 40), 0.7),
+        _box(slice(25, 35), slice(5, 25), 0.4),
+    ]
+    stats = _check_global_stats(masks)
+    assert np.isfinite(stats["flux_total"])
+
+
+def test_hole_masks_match_overall_mask() -> None:
+    hole = _box(slice(10, 20), slice(10, 20), -1.0)
+    partial_hole = _box(slice(15, 25), slice(15, 25), -0.5)
+
+    # holes alone clip to an empty overall mask
+    for masks in ([hole], [hole, partial_hole]):
+        stats = _check_global_stats(masks)
+        assert all(np.isnan(stats[key]) for key in GLOBAL_KEYS)
+
+    # holes in a positive mask only remove their own pixels
+    _check_global_stats([_box(slice(5, 30), slice(5, 30), 1.0), hole, partial_hole])
@@ -335,3 +335,22 @@ def nested_cast(
         return y
 
     return _cast(a, b, "<root>")
+
+
+def nested_update(
+        target: dict,
+        source: Mapping,
+) -> dict:
+    """
+    Recursively merge `source` into `target` in place.
+
+    Nested mappings are merged key by key; any other value in `source`
+    (including lists) replaces the value in `target`.
+    """
+    for k, v in source.items():
+        if isinstance(v, Mapping) and isinstance(target.get(k), dict):
+            nested_update(target[k], v)
+        else:
+            target[k] = v
+
+    return target